@@ -1,13 +1,26 @@
-import json
+import atexit
+import copy
+import queue
+import sys
+import threading
 import time
+import msgpack
+import orjson
+from collections import Counter, deque
+from dataclasses import replace
 from datetime import datetime
 from typing import Dict, List
-import sys
-from pathlib import Path
 
-sys.path.append(str(Path(__file__).parent.parent))
 from config.settings import LEARNING_CONFIG, LOGS_DIR
-from utils.message_format import create_message
+from utils.message_format import Message, create_message
+from utils.logger import get_logger
+
+logger = get_logger("learning_agent")
+
+# Control markers for the history writer thread
+_FLUSH = object()
+_STOP = object()
+
 
 class LearningAgent:
     """
@@ -18,54 +31,109 @@ class LearningAgent:
     - Suggests improvements
     """
     
+    __slots__ = (
+        'log_file', 'history_file', 'performance_stats', 'object_stats',
+        '_recent', '_report_version', '_cached_report', '_cached_report_version',
+        '_rec_cache', '_rec_cache_key', '_log_fp', '_unflushed', '_q', '_writer'
+    )
+    
     def __init__(self):
-        print("🧠 Initializing Learning Agent...")
+        logger.info("🧠 Initializing Learning Agent...")
         
         self.log_file = LEARNING_CONFIG["log_file"]
-        self.action_history = []
+        self.history_file = LEARNING_CONFIG["history_file"]
         self.performance_stats = {
             "total_actions": 0,
             "successful_actions": 0,
-            "failed_actions": 0,
-            "success_rate": 0.0
+            "failed_actions": 0
         }
         
         # Object-specific stats
         self.object_stats = {}
         
+        # Ring buffer of the most recent actions
+        self._recent = deque(maxlen=10)
+        
+        # Last report, reused until a new action is logged
+        self._report_version = 0
+        self._cached_report = None
+        self._cached_report_version = -1
+        
+        # Last recommendations, keyed by a stats fingerprint
+        self._rec_cache = None
+        self._rec_cache_key = None
+        
         # Load previous logs if exist
         self._load_history()
         
-        print("✅ Learning Agent ready!")
+        # Append-only history log, kept open for the agent's lifetime
+        self._log_fp = open(self.history_file, 'ab', buffering=1 << 16)
+        self._unflushed = 0
+        
+        # Serialization and disk writes happen on a background thread
+        self._q = queue.Queue()
+        self._writer = threading.Thread(
+            target=self._writer_loop, name="learning-writer", daemon=True
+        )
+        self._writer.start()
+        
+        # The writer thread keeps this agent alive, so __del__ would never run;
+        # flush at interpreter exit for callers that never call stop()
+        atexit.register(self.stop)
+        
+        logger.info("✅ Learning Agent ready!")
     
     def _load_history(self):
-        """Load previous action history"""
+        """Replay previous action history and rebuild stats"""
         try:
-            if self.log_file.exists():
-                with open(self.log_file, 'r') as f:
-                    data = json.load(f)
-                    self.action_history = data.get("history", [])
-                    self.performance_stats = data.get("stats", self.performance_stats)
-                    self.object_stats = data.get("object_stats", {})
-                print(f"📚 Loaded {len(self.action_history)} previous actions")
+            if self.history_file.exists():
+                with open(self.history_file, 'rb+') as f:
+                    unpacker = msgpack.Unpacker(f)
+                    batch = []
+                    good_end = 0  # End of the last complete record
+                    corrupt = False
+                    try:
+                        for log_entry in unpacker:
+                            batch.append(log_entry)
+                            good_end = unpacker.tell()
+                            if len(batch) == 4096:
+                                self._replay(batch)
+                                batch = []
+                    except (ValueError, msgpack.UnpackException) as e:
+                        # Mid-file damage: later records may still be valid, so keep the file as is
+                        corrupt = True
+                        logger.warning("⚠️ Corrupt history record at byte %s, replay stopped there: %r", good_end, e)
+                    self._replay(batch)
+                    
+                    # The unpacker ran out of data mid-record: a tail torn by a crash.
+                    # Drop it, or new appends would sit behind it unreadable
+                    size = f.seek(0, 2)
+                    if not corrupt and good_end < size:
+                        logger.warning("⚠️ Discarding %s trailing bytes of history", size - good_end)
+                        f.truncate(good_end)
+                logger.info("📚 Loaded %s previous actions", self.performance_stats['total_actions'])
         except Exception as e:
-            print(f"⚠️ Could not load history: {e}")
+            logger.warning("⚠️ Could not load history: %s", e)
+    
+    def _replay(self, batch: List[Dict]):
+        """Apply a batch of stored log entries to recent actions and stats"""
+        self._recent.extend(batch)
+        self._update_stats_batch(batch)
     
     def _save_history(self):
-        """Save action history to file"""
+        """Save aggregate stats snapshot to file"""
         try:
             data = {
-                "history": self.action_history,
-                "stats": self.performance_stats,
-                "object_stats": self.object_stats,
-                "last_updated": datetime.now().isoformat()
+                "stats": self._overall_performance(),
+                "object_stats": self._object_performance(),
+                "last_updated": datetime.now()
             }
             
-            with open(self.log_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            with open(self.log_file, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
             
         except Exception as e:
-            print(f"⚠️ Could not save history: {e}")
+            logger.warning("⚠️ Could not save history: %s", e)
     
     def log_action(self, action_data: Dict):
         """
@@ -80,7 +148,38 @@ class LearningAgent:
                 "error": "optional error message"
             }
         """
-        timestamp = datetime.now().isoformat()
+        log_entry = self._record(action_data)
+        self._update_stats(log_entry)
+        
+        # Flush history log periodically
+        self._unflushed += 1
+        if self._unflushed >= LEARNING_CONFIG["save_frequency"]:
+            self._q.put_nowait(_FLUSH)
+            self._unflushed = 0
+        
+        logger.info("\n📝 Logged action: %s → %s", log_entry['action'], log_entry['result'])
+    
+    def log_actions_batch(self, actions: List[Dict]):
+        """
+        Log several actions with a single flush at the end
+        
+        Args:
+            actions: List of action_data dicts (see log_action)
+        """
+        record = self._record
+        self._update_stats_batch([record(action_data) for action_data in actions])
+        
+        self._q.put_nowait(_FLUSH)
+        self._unflushed = 0
+        
+        logger.info("\n📝 Logged %s actions", len(actions))
+    
+    def _record(self, action_data: Dict) -> Dict:
+        """Add action to history and queue it for the history log"""
+        if self._log_fp.closed:
+            raise RuntimeError("Learning agent is stopped; action not logged")
+        
+        timestamp = time.time_ns()
         
         log_entry = {
             "timestamp": timestamp,
@@ -92,81 +191,148 @@ class LearningAgent:
         }
         
         # Add to history
-        self.action_history.append(log_entry)
+        self._recent.append(log_entry)
         
-        # Update stats
-        self._update_stats(log_entry)
+        # Hand off to the writer thread
+        self._q.put_nowait(log_entry)
         
-        # Save periodically
-        if len(self.action_history) % LEARNING_CONFIG["save_frequency"] == 0:
-            self._save_history()
+        self._report_version += 1
         
-        print(f"\n📝 Logged action: {log_entry['action']} → {log_entry['result']}")
+        return log_entry
     
     def _update_stats(self, log_entry: Dict):
         """Update performance statistics"""
-        # Overall stats
-        self.performance_stats["total_actions"] += 1
-        
-        if log_entry["result"] == "success":
-            self.performance_stats["successful_actions"] += 1
-        elif log_entry["result"] == "failure":
-            self.performance_stats["failed_actions"] += 1
+        result = log_entry["result"]
+        is_success = result == "success"
+        is_failure = result == "failure"
         
-        # Calculate success rate
-        total = self.performance_stats["total_actions"]
-        successful = self.performance_stats["successful_actions"]
-        self.performance_stats["success_rate"] = (successful / total * 100) if total > 0 else 0
+        # Overall stats
+        ps = self.performance_stats
+        ps["total_actions"] += 1
+        ps["successful_actions"] += is_success
+        ps["failed_actions"] += is_failure
         
         # Object-specific stats
         obj = log_entry.get("object")
         if obj:
-            if obj not in self.object_stats:
-                self.object_stats[obj] = {
+            os_map = self.object_stats
+            stats = os_map.get(obj)
+            if stats is None:
+                stats = os_map[obj] = {
                     "attempts": 0,
                     "successes": 0,
-                    "failures": 0,
-                    "success_rate": 0.0
+                    "failures": 0
                 }
             
-            self.object_stats[obj]["attempts"] += 1
-            
-            if log_entry["result"] == "success":
-                self.object_stats[obj]["successes"] += 1
-            elif log_entry["result"] == "failure":
-                self.object_stats[obj]["failures"] += 1
+            stats["attempts"] += 1
+            stats["successes"] += is_success
+            stats["failures"] += is_failure
+    
+    def _update_stats_batch(self, log_entries: List[Dict]):
+        """Update performance statistics for many entries at once"""
+        results = [entry["result"] for entry in log_entries]
+        
+        # Overall stats
+        ps = self.performance_stats
+        ps["total_actions"] += len(results)
+        ps["successful_actions"] += results.count("success")
+        ps["failed_actions"] += results.count("failure")
+        
+        # Object-specific stats, one update per (object, result) pair
+        counts = Counter(
+            (entry["object"], entry["result"]) for entry in log_entries if entry.get("object")
+        )
+        os_map = self.object_stats
+        for (obj, result), n in counts.items():
+            stats = os_map.get(obj)
+            if stats is None:
+                stats = os_map[obj] = {
+                    "attempts": 0,
+                    "successes": 0,
+                    "failures": 0
+                }
             
-            # Calculate object success rate
-            attempts = self.object_stats[obj]["attempts"]
-            successes = self.object_stats[obj]["successes"]
-            self.object_stats[obj]["success_rate"] = (successes / attempts * 100) if attempts > 0 else 0
+            stats["attempts"] += n
+            if result == "success":
+                stats["successes"] += n
+            elif result == "failure":
+                stats["failures"] += n
+    
+    @staticmethod
+    def _rate(successes: int, attempts: int) -> float:
+        """Success rate in percent"""
+        return 100 * successes / max(1, attempts)
+    
+    @property
+    def success_rate(self) -> float:
+        """Overall success rate in percent"""
+        return self._rate(
+            self.performance_stats["successful_actions"],
+            self.performance_stats["total_actions"]
+        )
+    
+    @staticmethod
+    def _format_ts(timestamp_ns: int) -> str:
+        """Convert an epoch-ns timestamp to ISO format"""
+        return datetime.fromtimestamp(timestamp_ns / 1e9).isoformat()
     
-    def get_performance_report(self) -> Dict:
+    def _overall_performance(self) -> Dict:
+        """Overall stats including the derived success rate"""
+        return {**self.performance_stats, "success_rate": self.success_rate}
+    
+    def _object_performance(self) -> Dict:
+        """Per-object stats including derived success rates"""
+        return {
+            obj: {**stats, "success_rate": self._rate(stats["successes"], stats["attempts"])}
+            for obj, stats in self.object_stats.items()
+        }
+    
+    def get_performance_report(self) -> Message:
         """
         Generate performance report
         Returns: Detailed performance statistics
         """
+        if self._cached_report_version == self._report_version:
+            return self._report_copy()
+        
         report = {
             "timestamp": datetime.now().isoformat(),
-            "overall_performance": self.performance_stats,
-            "object_performance": self.object_stats,
-            "recent_actions": self.action_history[-10:],  # Last 10 actions
+            "overall_performance": self._overall_performance(),
+            "object_performance": self._object_performance(),
+            "recent_actions": [  # Last 10 actions
+                {**entry, "timestamp": self._format_ts(entry["timestamp"])}
+                for entry in self._recent
+            ],
             "recommendations": self._generate_recommendations()
         }
         
-        return create_message(
+        self._cached_report = create_message(
             "learning_agent",
             "report",
             report,
             "success"
         )
+        self._cached_report_version = self._report_version
+        
+        return self._report_copy()
+    
+    def _report_copy(self) -> Message:
+        """Cached report with its own deep copy of data, so callers can't alter the cache"""
+        report = self._cached_report
+        return replace(report, data=copy.deepcopy(report.data))
     
     def _generate_recommendations(self) -> List[str]:
         """Generate improvement recommendations based on data"""
+        # Any newly logged action changes the key
+        ps = self.performance_stats
+        key = (ps["total_actions"], ps["successful_actions"], len(self.object_stats))
+        if key == self._rec_cache_key:
+            return self._rec_cache
+        
         recommendations = []
         
         # Check overall success rate
-        success_rate = self.performance_stats["success_rate"]
+        success_rate = self.success_rate
         
         if success_rate < 50:
             recommendations.append("⚠️ Low success rate - Check camera positioning and lighting")
@@ -176,33 +342,33 @@ class LearningAgent:
             recommendations.append("✅ Good success rate - System performing well")
         
         # Check object-specific performance
+        append = recommendations.append
+        rate = self._rate
         for obj, stats in self.object_stats.items():
-            if stats["success_rate"] < 50 and stats["attempts"] > 3:
-                recommendations.append(f"⚠️ Difficulty grasping {obj} - May need custom grip strategy")
+            if stats["attempts"] > 3 and rate(stats["successes"], stats["attempts"]) < 50:
+                append(f"⚠️ Difficulty grasping {obj} - May need custom grip strategy")
         
         # Check recent failures
-        recent_failures = [
-            entry for entry in self.action_history[-10:]
-            if entry["result"] == "failure"
-        ]
+        recent_failures = sum(entry["result"] == "failure" for entry in self._recent)
         
-        if len(recent_failures) >= 5:
+        if recent_failures >= 5:
             recommendations.append("🔴 Multiple recent failures - System may need maintenance")
         
+        self._rec_cache = recommendations
+        self._rec_cache_key = key
+        
         return recommendations
     
     def print_statistics(self):
         """Print formatted statistics to console"""
-        print("\n" + "="*60)
-        print("📊 LEARNING AGENT - PERFORMANCE STATISTICS")
-        print("="*60)
+        print("\n" + "="*60 + "\n📊 LEARNING AGENT - PERFORMANCE STATISTICS\n" + "="*60)
         
         # Overall stats
         print("\n🎯 Overall Performance:")
         print(f"   Total Actions: {self.performance_stats['total_actions']}")
         print(f"   Successful: {self.performance_stats['successful_actions']}")
         print(f"   Failed: {self.performance_stats['failed_actions']}")
-        print(f"   Success Rate: {self.performance_stats['success_rate']:.1f}%")
+        print(f"   Success Rate: {self.success_rate:.1f}%")
         
         # Object stats
         if self.object_stats:
@@ -210,7 +376,7 @@ class LearningAgent:
             for obj, stats in self.object_stats.items():
                 print(f"   {obj.title()}:")
                 print(f"      Attempts: {stats['attempts']}")
-                print(f"      Success Rate: {stats['success_rate']:.1f}%")
+                print(f"      Success Rate: {self._rate(stats['successes'], stats['attempts']):.1f}%")
         
         # Recommendations
         recommendations = self._generate_recommendations()
@@ -220,13 +386,49 @@ class LearningAgent:
                 print(f"   {rec}")
         
         print("="*60 + "\n")
+    
+    def _writer_loop(self):
+        """Drain queued log entries into the history log"""
+        packer = msgpack.Packer()
+        while True:
+            item = self._q.get()
+            try:
+                if item is _STOP:
+                    self._log_fp.flush()
+                    return
+                if item is _FLUSH:
+                    self._log_fp.flush()
+                else:
+                    self._log_fp.write(packer.pack(item))
+            except Exception as e:
+                logger.warning("⚠️ Could not write history: %s", e)
+            finally:
+                self._q.task_done()
+    
+    def flush(self):
+        """Block until every logged action is written to disk"""
+        if self._log_fp.closed:  # stop() already wrote everything; the writer is gone
+            return
+        
+        self._q.put(_FLUSH)
+        self._q.join()
+    
+    def stop(self):
+        """Flush history log and write final stats snapshot"""
+        if self._log_fp.closed:
+            return
+        
+        atexit.unregister(self.stop)
+        self._q.put(_STOP)
+        self._writer.join()
+        self._log_fp.close()
+        self._save_history()
+        logger.info("💾 Learning data saved")
 
 
 # Test the agent
 if __name__ == "__main__":
-    print("\n" + "="*60)
-    print("🧪 TESTING LEARNING AGENT")
-    print("="*60)
+    print("\n" + "="*60 + "\n🧪 TESTING LEARNING AGENT\n" + "="*60)
     
     agent = LearningAgent()
     
@@ -241,8 +443,9 @@ if __name__ == "__main__":
         {"action": "place", "object": "bottle", "result": "success", "duration": 2.5},
     ]
     
+    log = agent.log_action
     for action in test_actions:
-        agent.log_action(action)
+        log(action)
         time.sleep(0.5)
     
     # Print statistics
@@ -251,7 +454,11 @@ if __name__ == "__main__":
     # Get report
     print("\n📄 Generating detailed report...")
     report = agent.get_performance_report()
-    print(json.dumps(report['data'], indent=2))
+    sys.stdout.flush()
+    sys.stdout.buffer.write(orjson.dumps(report.data, option=orjson.OPT_INDENT_2) + b"\n")
+    sys.stdout.flush()
+    
+    agent.stop()
 
 
 
@@ -1,16 +1,14 @@
+import asyncio
 import time
 from typing import Dict, Optional
-import sys
-from pathlib import Path
 
-sys.path.append(str(Path(__file__).parent.parent))
 from config.settings import MASTER_CONFIG
-from utils.message_format import create_message, print_message
+from utils.message_format import create_message
 
 # Import other agents
 from agents.speech_agent import SpeechAgent
 from agents.vision_agent import VisionAgent
-from agents.motor_agent import MotorAgent
+from agents.motor_control_agent import MotorAgent
 from agents.learning_agent import LearningAgent
 
 class MasterAgent:
@@ -26,6 +24,8 @@ class MasterAgent:
     6. Log result (Learning Agent)
     """
     
+    __slots__ = ('speech_agent', 'vision_agent', 'motor_agent', 'learning_agent', 'running')
+    
     def __init__(self):
         print("\n" + "="*60)
         print("🧭 INITIALIZING MASTER AGENT (System Brain)")
@@ -50,7 +50,7 @@ class MasterAgent:
             print(f"\n❌ Failed to initialize Master Agent: {e}")
             raise
     
-    def start(self):
+    async def start(self):
         """Start the main control loop"""
         print("\n" + "="*60)
         print("🚀 STARTING ROBOTIC GRASPING SYSTEM")
@@ -72,14 +72,14 @@ class MasterAgent:
         
         try:
             while self.running:
-                self._process_command()
+                await self._process_command()
                 
-        except KeyboardInterrupt:
+        except (KeyboardInterrupt, asyncio.CancelledError):
             print("\n\n⚠️ Interrupted by user")
         finally:
             self.stop()
     
-    def _process_command(self):
+    async def _process_command(self):
         """Process a single user command"""
         
         # Step 1: Listen to user
@@ -87,15 +87,15 @@ class MasterAgent:
         print("Waiting for your command...")
         print("-"*60)
         
-        speech_result = self.speech_agent.get_command()
+        speech_result = await self.speech_agent.get_command()
         
-        if speech_result["status"] != "success":
+        if speech_result.status != "success":
             print("❌ Could not understand command. Please try again.")
             return
         
-        action = speech_result["data"].get("action")
-        target_object = speech_result["data"].get("object")
-        confidence = speech_result["data"].get("confidence", 0)
+        action = speech_result.data.get("action")
+        target_object = speech_result.data.get("object")
+        confidence = speech_result.data.get("confidence", 0)
         
         print(f"\n✅ Understood: {action} {target_object} (confidence: {confidence:.2f})")
         
@@ -105,9 +105,9 @@ class MasterAgent:
         elif action == "show":
             self._handle_show()
         elif action == "pick":
-            self._handle_pick(target_object)
+            await self._handle_pick(target_object)
         elif action == "place":
-            self._handle_place(target_object)
+            await self._handle_place(target_object)
         else:
             print(f"⚠️ Unknown action: {action}")
     
@@ -123,8 +123,8 @@ class MasterAgent:
         
         result = self.vision_agent.scan_scene()
         
-        if result["status"] == "success":
-            data = result["data"]
+        if result.status == "success":
+            data = result.data
             print(f"\n📊 Scan Results:")
             print(f"   Total objects detected: {data['total_objects']}")
             print(f"   Graspable objects: {data['graspable_count']}")
@@ -132,11 +132,11 @@ class MasterAgent:
             if data['graspable_count'] > 0:
                 print("\n   Detected objects:")
                 for obj in data['graspable_objects']:
-                    print(f"      - {obj['class_name']} (confidence: {obj['confidence']:.2f})")
+                    print(f"      - {obj.class_name} (confidence: {obj.confidence:.2f})")
         else:
             print("❌ Failed to scan scene")
     
-    def _handle_pick(self, target_object: str):
+    async def _handle_pick(self, target_object: str):
         """
         Handle pick command
         Complete workflow: Find object → Move → Grasp → Log
@@ -145,7 +145,7 @@ class MasterAgent:
             print("❌ No object specified")
             return
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         print(f"\n🎯 Starting PICK workflow for: {target_object}")
         print("-"*60)
@@ -153,8 +153,9 @@ class MasterAgent:
         # Step 1: Find object with vision
         print("\n1️⃣ Searching for object...")
         vision_result = self.vision_agent.find_object(target_object)
+        object_info = vision_result.data
         
-        if vision_result["status"] != "success" or not vision_result["data"].get("found"):
+        if vision_result.status != "success" or not object_info.get("found"):
             print(f"❌ Could not find {target_object}")
             
             # Log failure
@@ -162,24 +163,34 @@ class MasterAgent:
                 "action": "pick",
                 "object": target_object,
                 "result": "failure",
-                "duration": time.time() - start_time,
+                "duration": time.perf_counter() - start_time,
                 "error": "Object not found"
             })
             return
         
-        object_info = vision_result["data"]
-        position = object_info.get("position")
+        position = object_info["position"]
+        h, v, d = position["horizontal"], position["vertical"], position["depth"]
         
         print(f"✅ Found {target_object}!")
-        print(f"   Position: {position['horizontal']}, {position['vertical']}, {position['depth']}")
+        print(f"   Position: {h}, {v}, {d}")
         
-        # Step 2: Execute pick with motor agent
+        # Step 2: Execute pick with motor agent while vision keeps tracking
         print("\n2️⃣ Executing pick sequence...")
-        motor_result = self.motor_agent.pick_object(object_info)
+        motor_result, tracking_result = await asyncio.gather(
+            self.motor_agent.pick_object(object_info),
+            self.vision_agent.track_object(target_object)
+        )
+        # The arm changed the scene; don't trust cached detections
+        self.vision_agent.invalidate_scene_cache()
+        
+        tracking_info = tracking_result.data
+        if tracking_info.get("found"):
+            tracked = tracking_info["position"]
+            print(f"👁️ Tracked {target_object} at: {tracked['horizontal']}, {tracked['vertical']}, {tracked['depth']}")
         
-        duration = time.time() - start_time
+        duration = time.perf_counter() - start_time
         
-        if motor_result["status"] == "success":
+        if motor_result.status == "success":
             print(f"\n✅ Successfully picked {target_object}! (took {duration:.1f}s)")
             
             # Log success
@@ -199,16 +210,16 @@ class MasterAgent:
                 "object": target_object,
                 "result": "failure",
                 "duration": duration,
-                "error": motor_result["data"].get("error")
+                "error": motor_result.data.get("error")
             })
         
         print("-"*60)
     
-    def _handle_place(self, target_object: str):
+    async def _handle_place(self, target_object: str):
         """Handle place command"""
         print(f"\n🎯 Starting PLACE workflow...")
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Default position (center, front)
         target_position = {
@@ -217,10 +228,11 @@ class MasterAgent:
             "depth": "close"
         }
         
-        motor_result = self.motor_agent.place_object(target_position)
-        duration = time.time() - start_time
+        motor_result = await self.motor_agent.place_object(target_position)
+        self.vision_agent.invalidate_scene_cache()
+        duration = time.perf_counter() - start_time
         
-        if motor_result["status"] == "success":
+        if motor_result.status == "success":
             print(f"\n✅ Successfully placed object! (took {duration:.1f}s)")
             
             self.learning_agent.log_action({
@@ -251,6 +263,7 @@ class MasterAgent:
         # Print final statistics
         print("\n📊 Final Performance Statistics:")
         self.learning_agent.print_statistics()
+        self.learning_agent.stop()
         
         print("\n✅ System shut down successfully")
         print("="*60 + "\n")
@@ -264,7 +277,10 @@ if __name__ == "__main__":
     
     try:
         master = MasterAgent()
-        master.start()
+        asyncio.run(master.start())
+        
+    except KeyboardInterrupt:
+        pass
         
     except Exception as e:
         print(f"\n❌ System error: {e}")
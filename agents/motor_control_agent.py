@@ -1,11 +1,35 @@
-import time
+import asyncio
+import functools
 from typing import Dict
-import sys
-from pathlib import Path
 
-sys.path.append(str(Path(__file__).parent.parent))
 from config.settings import MOTOR_CONFIG
-from utils.message_format import create_message
+from utils.message_format import Message, create_message
+from utils.detection import BBox, Detection
+from utils.logger import get_logger
+
+logger = get_logger("motor_agent")
+
+# Coarse vision labels -> fraction of max reach along each axis
+AXIS_FRACTIONS = {
+    "horizontal": {"left": -0.5, "center": 0.0, "right": 0.5},
+    "vertical": {"top": 0.5, "middle": 0.0, "bottom": -0.5},
+    "depth": {"very_close": 0.25, "close": 0.5, "medium": 0.75, "far": 1.0},
+}
+
+
+@functools.lru_cache(maxsize=32)
+def _plan_motion(horizontal: str, vertical: str, depth: str) -> Dict:
+    """
+    Convert a coarse {horizontal, vertical, depth} position to arm coordinates
+    Cached, so repeated targets skip planning
+    """
+    reach = MOTOR_CONFIG["max_reach"]
+    return {
+        "x": AXIS_FRACTIONS["horizontal"].get(horizontal, 0.0) * reach,
+        "y": AXIS_FRACTIONS["depth"].get(depth, 0.5) * reach,
+        "z": AXIS_FRACTIONS["vertical"].get(vertical, 0.0) * reach
+    }
+
 
 class MotorAgent:
     """
@@ -13,23 +37,25 @@ class MotorAgent:
     Later: Connect to Arduino/Raspberry Pi for real hardware
     """
     
+    __slots__ = ('simulation_mode', 'current_position', 'gripper_open', 'serial')
+    
     def __init__(self):
-        print("🦾 Initializing Motor Agent...")
+        logger.info("🦾 Initializing Motor Agent...")
         
         self.simulation_mode = MOTOR_CONFIG["simulation_mode"]
         self.current_position = {"x": 0, "y": 0, "z": 0}
         self.gripper_open = True
         
         if self.simulation_mode:
-            print("⚠️ Running in SIMULATION mode")
+            logger.info("⚠️ Running in SIMULATION mode")
         else:
-            print("🔌 Hardware mode (not implemented yet)")
+            logger.info("🔌 Hardware mode (not implemented yet)")
             # TODO: Initialize serial connection to Arduino
             # self.serial = serial.Serial(MOTOR_CONFIG["serial_port"], MOTOR_CONFIG["baud_rate"])
         
-        print("✅ Motor Agent ready!")
+        logger.info("✅ Motor Agent ready!")
     
-    def move_to_position(self, target_position: Dict) -> Dict:
+    async def move_to_position(self, target_position: Dict) -> Message:
         """
         Move robot arm to target position
         
@@ -39,22 +65,26 @@ class MotorAgent:
         Returns:
             Message with movement result
         """
-        print(f"\n🦾 Moving to position: {target_position}")
+        logger.info("\n🦾 Moving to position: %s", target_position)
+        
+        if "x" in target_position:
+            coordinates = target_position
+        else:
+            coordinates = _plan_motion(
+                target_position.get("horizontal"),
+                target_position.get("vertical"),
+                target_position.get("depth")
+            )
         
         if self.simulation_mode:
-            # Simulate movement with delays
-            print("   ↔️ Moving horizontally...")
-            time.sleep(0.5)
-            
-            print("   ↕️ Moving vertically...")
-            time.sleep(0.5)
+            # Simulate horizontal, vertical and height moves in one delay
+            logger.info("   ↔️ ↕️ ⬆️ Moving to x=%.2f y=%.2f z=%.2f...",
+                        coordinates["x"], coordinates["y"], coordinates["z"])
+            await asyncio.sleep(1.5)
             
-            print("   ⬆️ Adjusting height...")
-            time.sleep(0.5)
+            logger.info("   ✅ Position reached!")
             
-            print("   ✅ Position reached!")
-            
-            self.current_position = target_position
+            self.current_position = dict(coordinates)
             
             return create_message(
                 "motor_agent",
@@ -70,13 +100,13 @@ class MotorAgent:
             # self.serial.write(f"MOVE {x} {y} {z}\n".encode())
             pass
     
-    def open_gripper(self) -> Dict:
+    async def open_gripper(self) -> Message:
         """Open gripper to release object"""
-        print("\n🖐️ Opening gripper...")
+        logger.info("\n🖐️ Opening gripper...")
         
         if self.simulation_mode:
-            time.sleep(0.3)
-            print("   ✅ Gripper opened!")
+            await asyncio.sleep(0.3)
+            logger.info("   ✅ Gripper opened!")
             self.gripper_open = True
             
             return create_message(
@@ -90,13 +120,13 @@ class MotorAgent:
             # self.serial.write("GRIPPER OPEN\n".encode())
             pass
     
-    def close_gripper(self) -> Dict:
+    async def close_gripper(self) -> Message:
         """Close gripper to grasp object"""
-        print("\n✊ Closing gripper...")
+        logger.info("\n✊ Closing gripper...")
         
         if self.simulation_mode:
-            time.sleep(0.3)
-            print("   ✅ Gripper closed!")
+            await asyncio.sleep(0.3)
+            logger.info("   ✅ Gripper closed!")
             self.gripper_open = False
             
             return create_message(
@@ -110,7 +140,7 @@ class MotorAgent:
             # self.serial.write("GRIPPER CLOSE\n".encode())
             pass
     
-    def pick_object(self, object_info: Dict) -> Dict:
+    async def pick_object(self, object_info: Dict) -> Message:
         """
         Complete pick sequence:
         1. Move to object
@@ -119,28 +149,30 @@ class MotorAgent:
         4. Close gripper
         5. Move up
         """
-        print("\n🎯 Starting PICK sequence...")
+        logger.info("\n🎯 Starting PICK sequence...")
         
         try:
             # Step 1: Move to object position
             position = object_info.get("position", {})
-            self.move_to_position(position)
+            await self.move_to_position(position)
             
             # Step 2: Open gripper
-            self.open_gripper()
+            await self.open_gripper()
             
             # Step 3: Move down to object
-            print("\n⬇️ Moving down to object...")
-            time.sleep(0.5)
+            logger.info("\n⬇️ Moving down to object...")
+            await asyncio.sleep(0.5)
             
             # Step 4: Close gripper (grasp)
-            self.close_gripper()
+            await self.close_gripper()
             
             # Step 5: Lift object
-            print("\n⬆️ Lifting object...")
-            time.sleep(0.5)
+            logger.info("\n⬆️ Lifting object...")
+            await asyncio.sleep(0.5)
+            
+            logger.info("\n✅ PICK sequence complete!")
             
-            print("\n✅ PICK sequence complete!")
+            detection = object_info.get("object")
             
             return create_message(
                 "motor_agent",
@@ -148,13 +180,13 @@ class MotorAgent:
                 {
                     "action": "pick",
                     "status": "success",
-                    "object": object_info.get("object", {}).get("class_name")
+                    "object": detection.class_name if detection else None
                 },
                 "success"
             )
             
         except Exception as e:
-            print(f"\n❌ PICK sequence failed: {e}")
+            logger.error("\n❌ PICK sequence failed: %s", e)
             return create_message(
                 "motor_agent",
                 "action",
@@ -162,7 +194,7 @@ class MotorAgent:
                 "error"
             )
     
-    def place_object(self, target_position: Dict) -> Dict:
+    async def place_object(self, target_position: Dict) -> Message:
         """
         Complete place sequence:
         1. Move to position
@@ -170,24 +202,24 @@ class MotorAgent:
         3. Open gripper
         4. Move up
         """
-        print("\n🎯 Starting PLACE sequence...")
+        logger.info("\n🎯 Starting PLACE sequence...")
         
         try:
             # Step 1: Move to target position
-            self.move_to_position(target_position)
+            await self.move_to_position(target_position)
             
             # Step 2: Move down
-            print("\n⬇️ Moving down...")
-            time.sleep(0.5)
+            logger.info("\n⬇️ Moving down...")
+            await asyncio.sleep(0.5)
             
             # Step 3: Open gripper (release)
-            self.open_gripper()
+            await self.open_gripper()
             
             # Step 4: Move up
-            print("\n⬆️ Moving up...")
-            time.sleep(0.5)
+            logger.info("\n⬆️ Moving up...")
+            await asyncio.sleep(0.5)
             
-            print("\n✅ PLACE sequence complete!")
+            logger.info("\n✅ PLACE sequence complete!")
             
             return create_message(
                 "motor_agent",
@@ -197,7 +229,7 @@ class MotorAgent:
             )
             
         except Exception as e:
-            print(f"\n❌ PLACE sequence failed: {e}")
+            logger.error("\n❌ PLACE sequence failed: %s", e)
             return create_message(
                 "motor_agent",
                 "action",
@@ -205,9 +237,9 @@ class MotorAgent:
                 "error"
             )
     
-    def stop(self) -> Dict:
+    def stop(self) -> Message:
         """Emergency stop"""
-        print("\n🛑 EMERGENCY STOP!")
+        logger.warning("\n🛑 EMERGENCY STOP!")
         
         return create_message(
             "motor_agent",
@@ -236,7 +268,15 @@ if __name__ == "__main__":
     # Test pick sequence
     print("\n1️⃣ Testing PICK sequence...")
     test_object = {
-        "object": {"class_name": "bottle"},
+        "object": Detection("bottle", 0.9, BBox(280, 200, 360, 280, 320, 240, 80, 80), True),
         "position": {"horizontal": "center", "vertical": "middle", "depth": "close"}
     }
-    result = agent.pick_
\ No newline at end of file
+    result = asyncio.run(agent.pick_object(test_object))
+    print(f"   Result: {result.status}")
+    
+    # Test place sequence
+    print("\n2️⃣ Testing PLACE sequence...")
+    result = asyncio.run(agent.place_object({"horizontal": "left", "vertical": "middle", "depth": "close"}))
+    print(f"   Result: {result.status}")
+    
+    print(f"\n📊 Status: {agent.get_status()}")
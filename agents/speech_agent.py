@@ -1,14 +1,38 @@
 import speech_recognition as sr
 import google.generativeai as genai
+import asyncio
+import functools
 import json
-from typing import Dict, Optional
-import sys
-from pathlib import Path
+import queue
+import re
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+try:
+    from vosk import Model, KaldiRecognizer
+except ImportError:
+    Model = KaldiRecognizer = None
 
-# Add project root to path
-sys.path.append(str(Path(__file__).parent.parent))
 from config.settings import GEMINI_API_KEY, SPEECH_CONFIG
-from utils.message_format import create_message
+from utils.message_format import Message, create_message, format_ts
+from utils.logger import get_logger
+
+logger = get_logger("speech_agent")
+
+# Gemini intent prompt, filled with the utterance via str.format
+INTENT_PROMPT = """
+Extract the ACTION and OBJECT from this command: "{text}"
+
+Actions: pick, place, move, show, stop
+Objects: Any graspable object mentioned
+
+Return JSON: {{"action": "action_name", "object": "object_name", "confidence": 0.0-1.0}}
+
+Example:
+Input: "Could you grab that bottle?"
+Output: {{"action": "pick", "object": "bottle", "confidence": 0.9}}
+"""
 
 class SpeechAgent:
     """
@@ -17,75 +41,210 @@ class SpeechAgent:
     """
     
     def __init__(self):
-        print("👂 Initializing Speech Agent...")
+        logger.info("👂 Initializing Speech Agent...")
         
         # Speech recognition setup
         self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
+        self._vosk = self._load_vosk()
+        if self._vosk is not None:
+            self.microphone = sr.Microphone(sample_rate=SPEECH_CONFIG["sample_rate"])
+        else:
+            self.microphone = sr.Microphone()
         
         # Gemini AI setup
         if GEMINI_API_KEY:
             genai.configure(api_key=GEMINI_API_KEY)
-            self.model = genai.GenerativeModel('gemini-pro')
+            self.model = genai.GenerativeModel(SPEECH_CONFIG["gemini_model"])
+            self.generation_config = genai.types.GenerationConfig(
+                response_mime_type="application/json",
+                max_output_tokens=64,
+                temperature=0.0
+            )
             self.use_gemini = SPEECH_CONFIG["use_gemini"]
         else:
-            print("⚠️ No Gemini API key - using keywords only")
+            logger.warning("⚠️ No Gemini API key - using keywords only")
             self.use_gemini = False
         
         # Simple keyword database
         self.action_keywords = {
-            "pick": ["pick", "grab", "take", "get", "pickup"],
-            "place": ["place", "put", "drop", "set", "release"],
-            "move": ["move", "shift", "transfer"],
-            "show": ["show", "display", "list", "find"],
-            "stop": ["stop", "halt", "cancel", "abort"]
+            "pick": frozenset({"pick", "grab", "take", "get", "pickup"}),
+            "place": frozenset({"place", "put", "drop", "set", "release"}),
+            "move": frozenset({"move", "shift", "transfer"}),
+            "show": frozenset({"show", "display", "list", "find"}),
+            "stop": frozenset({"stop", "halt", "cancel", "abort"})
         }
         
-        self.known_objects = [
+        self.known_objects = frozenset({
             "bottle", "cup", "glass", "bowl", "can",
             "phone", "book", "pen", "remote", "ball",
             "banana", "apple", "orange", "box"
-        ]
+        })
+        
+        # Whole-word matchers: keyword -> canonical action, plus objects
+        self._action_map = {kw: action for action, kws in self.action_keywords.items() for kw in kws}
+        self._action_re = self._word_regex(self._action_map)
+        self._obj_re = self._word_regex(self.known_objects)
+        
+        # Repeated utterances are answered without calling Gemini again
+        self._gemini_parse = functools.lru_cache(maxsize=512)(self._query_gemini)
+        
+        # Captured phrases waiting for transcription (filled by the listener thread)
+        self._audio_q = queue.Queue(maxsize=4)
+        self._listener = None
+        
+        # Streaming hypotheses as (utterance_id, text, is_final) when Vosk is used
+        self._hyp_q = queue.Queue(maxsize=64)
+        self._handled_utt = -1
+        
+        # Most recent understood command not yet handed out over HTTP
+        self._latest = None
+        self._latest_lock = threading.Lock()
         
         # Calibrate for noise
         with self.microphone as source:
             self.recognizer.adjust_for_ambient_noise(source, duration=1)
         
-        print("✅ Speech Agent ready!")
+        logger.info("✅ Speech Agent ready!")
     
-    def listen(self) -> Optional[str]:
-        """
-        Capture voice and convert to text
-        Returns: Text string or None if failed
-        """
-        print("\n🎤 Listening... Speak now!")
+    def _load_vosk(self) -> Optional["KaldiRecognizer"]:
+        """Load the local streaming recognizer, or None to fall back to Google"""
+        model_path = SPEECH_CONFIG["vosk_model_path"]
+        if KaldiRecognizer is None or not model_path.exists():
+            logger.warning("⚠️ Vosk model not available - using Google speech recognition")
+            return None
         
+        return KaldiRecognizer(Model(str(model_path)), SPEECH_CONFIG["sample_rate"])
+    
+    def _capture(self) -> sr.AudioData:
+        """Record a single phrase from the microphone"""
         with self.microphone as source:
+            return self.recognizer.listen(
+                source, 
+                timeout=SPEECH_CONFIG["timeout"],
+                phrase_time_limit=SPEECH_CONFIG["timeout"]
+            )
+    
+    def _transcribe(self, audio: sr.AudioData) -> Optional[str]:
+        """Convert captured audio to lowercase text, or None if failed"""
+        try:
+            logger.debug("🔄 Processing speech...")
+            text = self.recognizer.recognize_google(audio)
+            logger.info("📝 You said: '%s'", text)
+            return text.lower()
+            
+        except sr.UnknownValueError:
+            logger.warning("❌ Could not understand audio")
+            return None
+        except Exception as e:
+            logger.error("❌ Error: %s", e)
+            return None
+    
+    def start_listening(self):
+        """Start capturing phrases on a background thread"""
+        if self._listener is not None:
+            return
+        
+        loop = self._stream_loop if self._vosk is not None else self._listen_loop
+        self._listener = threading.Thread(
+            target=loop, name="speech-listener", daemon=True
+        )
+        self._listener.start()
+        logger.info("\n🎤 Listening... Speak now!")
+    
+    def _listen_loop(self):
+        """Keep the microphone busy while earlier phrases are being parsed"""
+        while True:
             try:
-                audio = self.recognizer.listen(
-                    source, 
-                    timeout=SPEECH_CONFIG["timeout"],
-                    phrase_time_limit=SPEECH_CONFIG["timeout"]
-                )
-                
-                print("🔄 Processing speech...")
-                text = self.recognizer.recognize_google(audio)
-                print(f"📝 You said: '{text}'")
-                return text.lower()
-                
+                audio = self._capture()
             except sr.WaitTimeoutError:
-                print("⏱️ Timeout - no speech detected")
-                return None
-            except sr.UnknownValueError:
-                print("❌ Could not understand audio")
-                return None
+                continue
             except Exception as e:
-                print(f"❌ Error: {e}")
-                return None
+                logger.error("❌ Error: %s", e)
+                time.sleep(1)
+                continue
+            
+            self._audio_q.put(audio)
+    
+    def _stream_loop(self):
+        """Feed microphone chunks to Vosk and publish partial/final hypotheses"""
+        recognizer = self._vosk
+        chunk = SPEECH_CONFIG["chunk_frames"]
+        utt = 0
+        last = ""
+        
+        with self.microphone as source:
+            while True:
+                data = source.stream.read(chunk)
+                
+                # Command already taken from this utterance - drop the rest of it
+                if self._handled_utt >= utt:
+                    recognizer.Reset()
+                    utt += 1
+                    last = ""
+                
+                if recognizer.AcceptWaveform(data):
+                    text = json.loads(recognizer.Result())["text"]
+                    if text:
+                        self._publish(utt, text, True)
+                    utt += 1
+                    last = ""
+                else:
+                    partial = json.loads(recognizer.PartialResult())["partial"]
+                    if partial and partial != last:
+                        self._publish(utt, partial, False)
+                        last = partial
+    
+    def _publish(self, utt: int, text: str, is_final: bool):
+        """Queue a hypothesis without ever stalling the audio stream"""
+        try:
+            self._hyp_q.put_nowait((utt, text, is_final))
+        except queue.Full:
+            pass
+    
+    async def _next_item(self, q: queue.Queue):
+        """Wait for the next item from a listener queue"""
+        # Short timeouts keep the worker thread from outliving the event loop
+        while True:
+            try:
+                return await asyncio.to_thread(q.get, timeout=0.5)
+            except queue.Empty:
+                continue
+    
+    async def _next_streamed(self) -> Tuple[str, Dict]:
+        """
+        Match keywords on each streamed hypothesis
+        Returns as soon as a command is recognised, before the user stops speaking
+        """
+        scanned_utt, scanned = -1, ""
+        result = None
+        
+        while True:
+            utt, text, is_final = await self._next_item(self._hyp_q)
+            if utt <= self._handled_utt:
+                continue
+            
+            # Partials usually just append words: only scan what is new
+            if utt == scanned_utt and text.startswith(scanned + " "):
+                self._scan_keywords(text, len(scanned) + 1, result)
+            else:
+                result = self.extract_keywords(text)
+            scanned_utt, scanned = utt, text
+            
+            if is_final or result["action"] == "stop" or (result["action"] and result["object"]):
+                self._handled_utt = utt
+                logger.info("📝 You said: '%s'", text)
+                return text, result
+    
+    @staticmethod
+    def _word_regex(words) -> re.Pattern:
+        """Compile one alternation matching any of the words as a whole word"""
+        # Longest first, so e.g. "pickup" is preferred over "pick"
+        alternation = "|".join(map(re.escape, sorted(words, key=len, reverse=True)))
+        return re.compile(rf"\b({alternation})\b")
     
     def extract_keywords(self, text: str) -> Dict:
         """
-        Fast keyword matching
+        Fast keyword matching (whole words only, e.g. "can" never matches "canister")
         Returns: {action, object, confidence}
         """
         result = {
@@ -94,82 +253,75 @@ class SpeechAgent:
             "confidence": 0.0
         }
         
-        # Find action
-        for action, keywords in self.action_keywords.items():
-            if any(keyword in text for keyword in keywords):
-                result["action"] = action
+        return self._scan_keywords(text, 0, result)
+    
+    def _scan_keywords(self, text: str, pos: int, result: Dict) -> Dict:
+        """Fill in whichever of action/object is still missing from text[pos:]"""
+        if result["action"] is None:
+            match = self._action_re.search(text, pos)
+            if match:
+                result["action"] = self._action_map[match.group(1)]
                 result["confidence"] += 0.5
-                break
         
-        # Find object
-        for obj in self.known_objects:
-            if obj in text:
-                result["object"] = obj
+        if result["object"] is None:
+            match = self._obj_re.search(text, pos)
+            if match:
+                result["object"] = match.group(1)
                 result["confidence"] += 0.5
-                break
         
         return result
     
+    def _query_gemini(self, text: str) -> Dict:
+        """Send one utterance to Gemini and parse its JSON answer"""
+        response = self.model.generate_content(
+            INTENT_PROMPT.format(text=text),
+            generation_config=self.generation_config
+        )
+        return json.loads(response.text)
+    
     def extract_with_gemini(self, text: str) -> Dict:
         """
         Use Gemini AI for natural language understanding
         Returns: {action, object, confidence}
         """
         try:
-            prompt = f"""
-Extract the ACTION and OBJECT from this command: "{text}"
-
-Actions: pick, place, move, show, stop
-Objects: Any graspable object mentioned
-
-Return ONLY JSON format:
-{{"action": "action_name", "object": "object_name", "confidence": 0.0-1.0}}
-
-Example:
-Input: "Could you grab that bottle?"
-Output: {{"action": "pick", "object": "bottle", "confidence": 0.9}}
-"""
-            
-            response = self.model.generate_content(prompt)
-            result_text = response.text.strip()
-            
-            # Clean JSON
-            result_text = result_text.replace("```json", "").replace("```", "").strip()
-            
-            result = json.loads(result_text)
-            return result
+            return dict(self._gemini_parse(text))
             
         except Exception as e:
-            print(f"⚠️ Gemini error: {e}")
+            logger.warning("⚠️ Gemini error: %s", e)
             return {"action": None, "object": None, "confidence": 0.0}
     
-    def get_command(self) -> Dict:
+    async def get_command(self) -> Message:
         """
         Main method: Get user command
         Returns: Standardized message format
         """
-        # Step 1: Listen
-        text = self.listen()
-        if not text:
-            return create_message(
-                "speech_agent",
-                "intent",
-                {"error": "No speech detected"},
-                "error"
-            )
-        
-        # Step 2: Try fast keyword matching
-        keyword_result = self.extract_keywords(text)
+        # Steps 1-2: Take the next phrase from the listener, transcribe and keyword-match it
+        self.start_listening()
+        if self._vosk is not None:
+            text, keyword_result = await self._next_streamed()
+        else:
+            audio = await self._next_item(self._audio_q)
+            text = await asyncio.to_thread(self._transcribe, audio)
+            if not text:
+                return create_message(
+                    "speech_agent",
+                    "intent",
+                    {"error": "No speech detected"},
+                    "error"
+                )
+            
+            keyword_result = self.extract_keywords(text)
         
         # Step 3: Use Gemini if confidence is low
         if keyword_result["confidence"] < SPEECH_CONFIG["confidence_threshold"] and self.use_gemini:
-            print("Using Gemini AI for better understanding...")
-            result = self.extract_with_gemini(text)
+            logger.info("Using Gemini AI for better understanding...")
+            result = await asyncio.to_thread(self.extract_with_gemini, text)
         else:
             result = keyword_result
         
         # Step 4: Return formatted message
-        return create_message(
+        message = create_message(
             "speech_agent",
             "intent",
             {
@@ -180,6 +332,33 @@ Output: {{"action": "pick", "object": "bottle", "confidence": 0.9}}
             },
             "success" if result.get("action") else "error"
         )
+        
+        if message.status == "success":
+            with self._latest_lock:
+                self._latest = message
+        
+        return message
+    
+    def pop_latest(self) -> Optional[Message]:
+        """
+        Take the most recent understood command
+        Returns: Message, or None if nothing new since the last call
+        """
+        with self._latest_lock:
+            message, self._latest = self._latest, None
+        return message
+    
+    def start_background(self):
+        """Keep understanding commands on a daemon thread (for the HTTP endpoint)"""
+        threading.Thread(
+            target=asyncio.run, args=(self._command_loop(),),
+            name="speech-commands", daemon=True
+        ).start()
+    
+    async def _command_loop(self):
+        """Parse commands forever; results are picked up via pop_latest"""
+        while True:
+            await self.get_command()
 
 
 # Test the agent
@@ -197,27 +376,47 @@ if __name__ == "__main__":
     print("="*60)
     
     while True:
-        result = agent.get_command()
+        result = asyncio.run(agent.get_command())
         
         print(f"\n📊 Result:")
-        print(f"   Action: {result['data'].get('action')}")
-        print(f"   Object: {result['data'].get('object')}")
-        print(f"   Confidence: {result['data'].get('confidence')}")
+        print(f"   Action: {result.data.get('action')}")
+        print(f"   Object: {result.data.get('object')}")
+        print(f"   Confidence: {result.data.get('confidence')}")
         
         cont = input("\n🔄 Test again? (y/n): ")
         if cont.lower() != 'y':
             break
 
 from flask import Flask, jsonify
-from speech_agent import SpeechAgent
 
 app = Flask(__name__)
-speech_agent = SpeechAgent()
+
+
+@functools.lru_cache(maxsize=None)
+def _server_agent() -> SpeechAgent:
+    """Speech agent for the HTTP endpoint, created and started on first use"""
+    agent = SpeechAgent()
+    agent.start_background()
+    return agent
+
+
+def latest_speech() -> Optional[Dict]:
+    """Newest understood command as a JSON-ready dict, or None if nothing new"""
+    message = _server_agent().pop_latest()
+    if message is None:
+        return None
+    # Timestamps stay integers internally; format once for the UI
+    return {**message.to_dict(), "timestamp": format_ts(message.ts_ns)}
+
 
 @app.route('/speech/latest', methods=['GET'])
 def get_latest_speech():
-    result = speech_agent.listen_and_understand()
-    return jsonify(result)
+    # Never blocks on the microphone: 204 until a new command has been understood
+    payload = latest_speech()
+    if payload is None:
+        return "", 204
+    return jsonify(payload)
 
 if __name__ == "__main__":
+    _server_agent()
     app.run(host="0.0.0.0", port=8002)
@@ -0,0 +1,28 @@
+"""
+Combined telemetry endpoint for the dashboard
+
+Serves the latest speech and vision state from one process so the
+dashboard needs a single request per refresh.
+
+Run: python -m agents.state_server
+"""
+from flask import Flask, jsonify
+
+from agents import speech_agent, vision_agent
+
+app = Flask(__name__)
+
+
+@app.route('/state/latest', methods=['GET'])
+def get_latest_state():
+    # Either side is {} when it has nothing new (no command yet / no camera frame)
+    return jsonify({
+        "speech": speech_agent.latest_speech() or {},
+        "vision": vision_agent.latest_vision(),
+    })
+
+if __name__ == "__main__":
+    # Start the microphone and camera before the first request
+    speech_agent._server_agent()
+    vision_agent._server_agent()
+    app.run(host="0.0.0.0", port=8000)
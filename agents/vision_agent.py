@@ -1,13 +1,79 @@
+import asyncio
+import functools
+import shutil
+import threading
+import time
+from collections import deque
 import cv2
+import torch
 from ultralytics import YOLO
 import numpy as np
-from typing import List, Dict, Optional
-import sys
 from pathlib import Path
+from typing import List, Dict, Optional
 
-sys.path.append(str(Path(__file__).parent.parent))
 from config.settings import VISION_CONFIG, GRASPABLE_OBJECTS
-from utils.message_format import create_message
+from utils.message_format import Message, create_message, format_ts
+from utils.detection import BBox, Detection
+from utils.logger import get_logger
+
+logger = get_logger("vision_agent")
+
+
+# Position labels, indexed by the codes from _classify
+H_LABELS = ("left", "center", "right")
+V_LABELS = ("top", "middle", "bottom")
+DEPTH_LABELS = ("far", "medium", "close", "very_close")
+DEPTH_BINS = np.array([0.03, 0.08, 0.15])  # Box area / frame area
+SCENE_THUMB_SIZE = (64, 48)  # Grey thumbnail (w, h) compared by the scene-change gate
+
+
+def _classify(centers: np.ndarray, areas: np.ndarray, h_bins: np.ndarray,
+              v_bins: np.ndarray, frame_area: int) -> np.ndarray:
+    """
+    Branchless position classification for N boxes
+    Returns: (N, 3) int8 codes for horizontal, vertical and depth
+    """
+    codes = np.empty((len(areas), 3), dtype=np.int8)
+    codes[:, 0] = np.digitize(centers[:, 0], h_bins)
+    codes[:, 1] = np.digitize(centers[:, 1], v_bins)
+    codes[:, 2] = np.digitize(areas / frame_area, DEPTH_BINS, right=True)
+    return codes
+
+
+def export_int8_model() -> Path:
+    """
+    One-time export of the configured YOLO weights to an INT8 OpenVINO model
+    VisionAgent loads it automatically from VISION_CONFIG["int8_model"]
+    """
+    target = VISION_CONFIG["int8_model"]
+    # Dynamic shapes: detect_objects sends 1 frame, find_object up to batch_size
+    exported = YOLO(VISION_CONFIG["model_name"]).export(
+        format="openvino", int8=True, dynamic=True, data="coco128.yaml"
+    )
+    
+    if target.exists():
+        shutil.rmtree(target)
+    shutil.move(exported, target)
+    
+    return target
+
+
+def _model_source(use_cuda: bool) -> str:
+    """
+    Pick the model to load
+    GPU runs the PyTorch weights in FP16; on CPU prefer the INT8 export when present
+    """
+    int8_model = VISION_CONFIG["int8_model"]
+    if not use_cuda and int8_model.exists():
+        return str(int8_model)
+    return VISION_CONFIG["model_name"]
+
+
+@functools.lru_cache(maxsize=4)
+def _load_yolo(source: str) -> YOLO:
+    """Load YOLO weights once per model source; later agents reuse the instance"""
+    return YOLO(source, task="detect")
+
 
 class VisionAgent:
     """
@@ -15,10 +81,11 @@ class VisionAgent:
     """
     
     def __init__(self):
-        print("👁️ Initializing Vision Agent...")
+        logger.info("👁️ Initializing Vision Agent...")
         
-        # Load YOLO model
-        self.model = YOLO(VISION_CONFIG["model_name"])
+        # Load YOLO model (FP16 on a CUDA GPU, else INT8 OpenVINO export if available)
+        self._cuda = torch.cuda.is_available()
+        self.model = _load_yolo(_model_source(self._cuda))
         self.class_names = self.model.names
         
         # Camera setup
@@ -26,140 +93,256 @@ class VisionAgent:
         self.cap = None
         self.frame_width = 0
         self.frame_height = 0
+        self._update_position_bins()
+        
+        # Most recent frames, searched together in one batched inference
+        # Filled by the grab thread; frames are never modified after being added
+        self._frame_buf = deque(maxlen=VISION_CONFIG["batch_size"])
+        self._frame_lock = threading.Lock()
+        self._first_frame = threading.Event()
+        self._grabber = None
+        self._running = False
+        self._resize = False
+        
+        # Last detections, the thumbnail of the newest frame they came from, and when
+        self._scene_cache = None
         
         # Graspable objects
         self.graspable_objects = GRASPABLE_OBJECTS
         
-        print("✅ Vision Agent ready!")
+        # Per-class lookup tables indexed by YOLO class id
+        class_ids = range(max(self.class_names) + 1)
+        self._name_arr = np.array([self.class_names.get(i, "") for i in class_ids])
+        self._name_lower = np.char.lower(self._name_arr)
+        self._graspable_mask = np.isin(self._name_arr, list(self.graspable_objects))
+        
+        logger.info("✅ Vision Agent ready!")
     
     def start_camera(self) -> bool:
         """Initialize camera"""
         self.cap = cv2.VideoCapture(self.camera_index)
         
         if not self.cap.isOpened():
-            print("❌ Failed to open camera")
+            logger.error("❌ Failed to open camera")
             return False
         
-        self.frame_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        self.frame_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        # Ask the driver for the configured size; MJPG keeps USB bandwidth down
+        width, height = VISION_CONFIG["resolution"]
+        self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"))
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        
+        # Cameras that ignore the request get downscaled once per grab instead
+        self._resize = (
+            int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)) != width
+            or int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) != height
+        )
+        self.frame_width = width
+        self.frame_height = height
+        self._update_position_bins()
+        
+        # Grab frames continuously so inference never waits on the camera
+        self._running = True
+        self._first_frame.clear()
+        self._grabber = threading.Thread(
+            target=self._grab_loop, name="camera-grabber", daemon=True
+        )
+        self._grabber.start()
+        self._first_frame.wait(timeout=2.0)
         
-        print(f"✅ Camera started: {self.frame_width}x{self.frame_height}")
+        logger.info("✅ Camera started: %sx%s", self.frame_width, self.frame_height)
         return True
     
     def stop_camera(self):
         """Release camera"""
+        self._running = False
+        if self._grabber:
+            self._grabber.join(timeout=1.0)
+            self._grabber = None
+        
         if self.cap:
             self.cap.release()
             cv2.destroyAllWindows()
-            print("📷 Camera stopped")
+            logger.info("📷 Camera stopped")
+    
+    def _update_position_bins(self):
+        """Precompute position thresholds for the current frame size"""
+        self._h_bins = np.array([self.frame_width * 0.33, self.frame_width * 0.66])
+        self._v_bins = np.array([self.frame_height * 0.33, self.frame_height * 0.66])
+        self._frame_area = max(1, self.frame_width * self.frame_height)
+    
+    def _grab_loop(self):
+        """Keep the frame buffer filled with the latest camera frames"""
+        cap = self.cap
+        size = (self.frame_width, self.frame_height)
+        while self._running:
+            if not cap.grab():
+                time.sleep(0.01)
+                continue
+            
+            ret, frame = cap.retrieve()
+            if not ret:
+                continue
+            if self._resize:
+                frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+            
+            with self._frame_lock:
+                self._frame_buf.append(frame)
+            self._first_frame.set()
+    
+    def _recent_frames(self) -> List[np.ndarray]:
+        """Buffered frames, newest first"""
+        with self._frame_lock:
+            return list(reversed(self._frame_buf))
     
     def capture_frame(self) -> Optional[np.ndarray]:
-        """Capture single frame"""
-        if not self.cap or not self.cap.isOpened():
-            return None
+        """Return a copy of the latest camera frame"""
+        with self._frame_lock:
+            if not self._frame_buf:
+                return None
+            frame = self._frame_buf[-1]
         
-        ret, frame = self.cap.read()
-        return frame if ret else None
+        return frame.copy()
     
-    def detect_objects(self, frame: np.ndarray) -> List[Dict]:
+    def detect_objects(self, frame: np.ndarray) -> List[Detection]:
         """
         Detect all objects in frame
         Returns: List of detected objects
         """
-        results = self.model(
-            frame, 
-            conf=VISION_CONFIG["confidence_threshold"],
-            verbose=False
-        )
+        return self.detect_batch([frame])[0]
+    
+    def detect_batch(self, frames: List[np.ndarray]) -> List[List[Detection]]:
+        """
+        Detect objects in several frames with a single YOLO call
+        Returns: One list of detected objects per frame
+        """
+        return [
+            [self._detection(cols, i) for i in range(len(cols["confidence"]))]
+            for cols in self._infer(frames)
+        ]
+    
+    def _infer(self, frames: List[np.ndarray]) -> List[Dict[str, np.ndarray]]:
+        """
+        Run YOLO on a batch of frames, newest first
+        Returns: Per-frame detection columns (one array row per box)
+        """
+        # Static scene: reuse recent detections instead of running YOLO
+        thumb = cv2.resize(cv2.cvtColor(frames[0], cv2.COLOR_BGR2GRAY), SCENE_THUMB_SIZE,
+                           interpolation=cv2.INTER_AREA)
+        now = time.monotonic()
+        cache = self._scene_cache
+        if (cache is not None and len(frames) <= len(cache[1])
+                and now - cache[2] < VISION_CONFIG["scene_cache_max_age"]
+                and not self._scene_changed(thumb, cache[0])):
+            return cache[1][:len(frames)]
         
-        detections = []
+        predictor = self.model.predictor
+        if predictor is None:
+            # First call builds and warms up the predictor with our settings
+            results = self.model.predict(
+                frames, 
+                stream=True,
+                conf=VISION_CONFIG["confidence_threshold"],
+                imgsz=VISION_CONFIG["resolution"][0],
+                device=0 if self._cuda else "cpu",
+                half=self._cuda,
+                verbose=False
+            )
+        else:
+            # Later calls reuse it directly, skipping per-call config merging
+            results = predictor(frames, stream=True)
         
-        for result in results:
-            for box in result.boxes:
-                # Extract detection info
-                x1, y1, x2, y2 = map(int, box.xyxy[0])
-                class_id = int(box.cls[0])
-                class_name = self.class_names[class_id]
-                confidence = float(box.conf[0])
-                
-                # Calculate center and size
-                center_x = (x1 + x2) // 2
-                center_y = (y1 + y2) // 2
-                width = x2 - x1
-                height = y2 - y1
-                
-                detection = {
-                    "class_name": class_name,
-                    "confidence": confidence,
-                    "bbox": {
-                        "x1": x1, "y1": y1,
-                        "x2": x2, "y2": y2,
-                        "center_x": center_x,
-                        "center_y": center_y,
-                        "width": width,
-                        "height": height
-                    },
-                    "is_graspable": class_name in self.graspable_objects
-                }
-                
-                detections.append(detection)
+        batch = [self._columns(result.boxes) for result in results]
+        self._scene_cache = (thumb, batch, now)
+        return batch
+    
+    @staticmethod
+    def _scene_changed(thumb: np.ndarray, cached: np.ndarray) -> bool:
+        """
+        Whether enough thumbnail pixels changed to need a fresh YOLO pass
+        Counts changed pixels rather than averaging, so one small object
+        appearing or disappearing still trips it
+        """
+        changed = cv2.absdiff(thumb, cached) > VISION_CONFIG["scene_pixel_threshold"]
+        return np.count_nonzero(changed) >= VISION_CONFIG["scene_changed_fraction"] * changed.size
+    
+    def invalidate_scene_cache(self):
+        """Force the next detection to run YOLO, e.g. after the arm moved something"""
+        self._scene_cache = None
+    
+    def _columns(self, boxes) -> Dict[str, np.ndarray]:
+        """Convert a Boxes tensor to NumPy columns with centers, sizes and graspable mask"""
+        xyxy = boxes.xyxy.cpu().numpy().astype(np.int32)
+        class_ids = boxes.cls.cpu().numpy().astype(np.int32)
+        names = self._name_arr[class_ids]
+        center = (xyxy[:, :2] + xyxy[:, 2:]) // 2
+        size = xyxy[:, 2:] - xyxy[:, :2]
         
-        return detections
+        return {
+            "class_id": class_ids,
+            "xyxy": xyxy,
+            "center": center,
+            "size": size,
+            "position": self.estimate_positions(center, size[:, 0] * size[:, 1]),
+            "class_name": names,
+            "confidence": boxes.conf.cpu().numpy(),
+            "is_graspable": self._graspable_mask[class_ids]
+        }
+    
+    def _detection(self, cols: Dict[str, np.ndarray], i: int) -> Detection:
+        """Materialize row i of the detection columns as a Detection"""
+        return Detection(
+            str(cols["class_name"][i]),
+            float(cols["confidence"][i]),
+            BBox(*cols["xyxy"][i].tolist(), *cols["center"][i].tolist(), *cols["size"][i].tolist()),
+            bool(cols["is_graspable"][i])
+        )
     
-    def estimate_position(self, detection: Dict) -> Dict:
+    def estimate_position(self, detection: Detection) -> Dict:
         """
         Estimate object position (left/center/right, near/far)
         """
-        cx = detection["bbox"]["center_x"]
-        cy = detection["bbox"]["center_y"]
-        area = detection["bbox"]["width"] * detection["bbox"]["height"]
+        bbox = detection.bbox
+        center = np.array([[bbox.center_x, bbox.center_y]])
+        area = np.array([bbox.width * bbox.height])
         
-        # Horizontal position
-        if cx < self.frame_width * 0.33:
-            horizontal = "left"
-        elif cx < self.frame_width * 0.66:
-            horizontal = "center"
-        else:
-            horizontal = "right"
-        
-        # Vertical position
-        if cy < self.frame_height * 0.33:
-            vertical = "top"
-        elif cy < self.frame_height * 0.66:
-            vertical = "middle"
-        else:
-            vertical = "bottom"
-        
-        # Depth estimation (based on size)
-        frame_area = self.frame_width * self.frame_height
-        area_ratio = area / frame_area
+        return self._position(self.estimate_positions(center, area), center, 0)
+    
+    def estimate_positions(self, centers: np.ndarray, areas: np.ndarray) -> np.ndarray:
+        """
+        Estimate positions of many boxes at once
         
-        if area_ratio > 0.15:
-            depth = "very_close"
-        elif area_ratio > 0.08:
-            depth = "close"
-        elif area_ratio > 0.03:
-            depth = "medium"
-        else:
-            depth = "far"
+        Args:
+            centers: (N, 2) array of box centers in pixels
+            areas: (N,) array of box areas in pixels (depth is based on size)
         
+        Returns:
+            (N, 3) int8 codes into H_LABELS, V_LABELS and DEPTH_LABELS
+        """
+        return _classify(centers, areas, self._h_bins, self._v_bins, self._frame_area)
+    
+    def _position(self, codes: np.ndarray, centers: np.ndarray, i: int) -> Dict:
+        """Materialize row i of the position codes as a position dict"""
+        h, v, d = codes[i].tolist()
+        cx, cy = centers[i].tolist()
         return {
-            "horizontal": horizontal,
-            "vertical": vertical,
-            "depth": depth,
+            "horizontal": H_LABELS[h],
+            "vertical": V_LABELS[v],
+            "depth": DEPTH_LABELS[d],
             "coordinates": {
                 "x": cx,
                 "y": cy
             }
         }
     
-    def find_object(self, target_object: str) -> Dict:
+    def find_object(self, target_object: str) -> Message:
         """
         Find specific object in scene
         Returns: Message with object info or not_found
         """
-        frame = self.capture_frame()
-        if frame is None:
+        # Search the newest frame first, older buffered frames as fallback
+        frames = self._recent_frames()
+        if not frames:
             return create_message(
                 "vision_agent",
                 "detection",
@@ -167,12 +350,19 @@ class VisionAgent:
                 "error"
             )
         
-        detections = self.detect_objects(frame)
+        batch = self._infer(frames)
+        
+        # Graspable classes whose name contains the target, indexed by class id
+        target_mask = self._graspable_mask & (np.char.find(self._name_lower, target_object.lower()) >= 0)
         
-        # Filter for target object
-        for det in detections:
-            if target_object.lower() in det["class_name"].lower() and det["is_graspable"]:
-                position = self.estimate_position(det)
+        # Filter for target object, building a Detection only for the best match
+        for cols in batch:
+            match = target_mask[cols["class_id"]]
+            if match.any():
+                candidates = np.flatnonzero(match)
+                best = candidates[np.argmax(cols["confidence"][candidates])]
+                det = self._detection(cols, best)
+                position = self._position(cols["position"], cols["center"], best)
                 
                 return create_message(
                     "vision_agent",
@@ -192,12 +382,19 @@ class VisionAgent:
             {
                 "found": False,
                 "target": target_object,
-                "total_objects": len(detections)
+                "total_objects": len(batch[0]["confidence"])
             },
             "error"
         )
     
-    def scan_scene(self) -> Dict:
+    async def track_object(self, target_object: str) -> Message:
+        """
+        Re-locate object without blocking the event loop
+        Lets vision run while the arm is moving
+        """
+        return await asyncio.to_thread(self.find_object, target_object)
+    
+    def scan_scene(self) -> Message:
         """
         Scan scene and return all graspable objects
         """
@@ -210,14 +407,14 @@ class VisionAgent:
                 "error"
             )
         
-        detections = self.detect_objects(frame)
-        graspable = [d for d in detections if d["is_graspable"]]
+        cols = self._infer([frame])[0]
+        graspable = [self._detection(cols, i) for i in np.flatnonzero(cols["is_graspable"])]
         
         return create_message(
             "vision_agent",
             "scan",
             {
-                "total_objects": len(detections),
+                "total_objects": len(cols["confidence"]),
                 "graspable_count": len(graspable),
                 "graspable_objects": graspable
             },
@@ -256,15 +453,15 @@ if __name__ == "__main__":
             elif key == ord('s'):
                 result = agent.scan_scene()
                 print(f"\n📊 Scan Result:")
-                print(f"   Total objects: {result['data']['total_objects']}")
-                print(f"   Graspable: {result['data']['graspable_count']}")
+                print(f"   Total objects: {result.data['total_objects']}")
+                print(f"   Graspable: {result.data['graspable_count']}")
                 input("Press ENTER to continue...")
             elif key == ord('f'):
                 target = input("\nEnter object to find: ")
                 result = agent.find_object(target)
-                if result['data'].get('found'):
+                if result.data.get('found'):
                     print(f"✅ Found {target}!")
-                    print(f"   Position: {result['data']['position']}")
+                    print(f"   Position: {result.data['position']}")
                 else:
                     print(f"❌ {target} not found")
                 input("Press ENTER to continue...")
@@ -273,23 +470,38 @@ if __name__ == "__main__":
         agent.stop_camera()
 
 
+from dataclasses import asdict
 from flask import Flask, jsonify
-from vision_agent import VisionAgent
 
 app = Flask(__name__)
-vision_agent = VisionAgent()
 
-@app.route('/vision/latest', methods=['GET'])
-def get_latest_vision():
-    frame_data = vision_agent.capture_frame()
-    detections = vision_agent.detect_objects(frame_data)
-    response = {
-        "timestamp": vision_agent.timestamp(),
-        "frame_b64": frame_data["frame_b64"],
-        "detections": detections,
+
+@functools.lru_cache(maxsize=None)
+def _server_agent() -> VisionAgent:
+    """Vision agent for the HTTP endpoint, created and started on first use"""
+    agent = VisionAgent()
+    agent.start_camera()
+    return agent
+
+
+def latest_vision() -> Dict:
+    """Current frame's detections as a JSON-ready dict, or {} before the first frame"""
+    vision_agent = _server_agent()
+    frame = vision_agent.capture_frame()
+    if frame is None:
+        return {}
+    
+    detections = vision_agent.detect_objects(frame)
+    return {
+        "timestamp": format_ts(time.time_ns()),
+        "detections": [asdict(d) for d in detections],
         "status": "ok"
     }
-    return jsonify(response)
+
+@app.route('/vision/latest', methods=['GET'])
+def get_latest_vision():
+    return jsonify(latest_vision())
 
 if __name__ == "__main__":
+    _server_agent()
     app.run(host="0.0.0.0", port=8001)
@@ -1,3 +1,4 @@
+import functools
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -13,8 +14,16 @@ LOGS_DIR.mkdir(parents=True, exist_ok=True)
 MODELS_DIR.mkdir(parents=True, exist_ok=True)
 
 # Load API keys from environment
-load_dotenv(BASE_DIR / "config" / "api_keys.env")
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
+@functools.cache
+def _load_env() -> str:
+    """Read config/api_keys.env once per process and return the Gemini key"""
+    load_dotenv(BASE_DIR / "config" / "api_keys.env")
+    return os.getenv("GEMINI_API_KEY", "")
+
+GEMINI_API_KEY = _load_env()
+
+# Agent console output (set to WARNING to silence per-step messages)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 
 # AGENT SETTINGS
 
@@ -24,14 +33,23 @@ SPEECH_CONFIG = {
     "timeout": 5,                    # Seconds to wait for speech
     "confidence_threshold": 0.7,     # Minimum confidence to accept command
     "use_gemini": True,              # Use AI for understanding
+    "gemini_model": "gemini-1.5-flash",  # Must support JSON output mode
+    "vosk_model_path": MODELS_DIR / "vosk-model-small-en-us-0.15",  # Local streaming STT (Google used if missing)
+    "sample_rate": 16000,            # Microphone rate expected by Vosk
+    "chunk_frames": 4000,            # Audio frames fed to Vosk per read
 }
 
 # 👁️ Vision Agent
 VISION_CONFIG = {
     "model_name": "yolov8n.pt",      # YOLO model (n=nano, s=small, m=medium)
+    "int8_model": MODELS_DIR / "yolov8n_int8_openvino_model",  # Used instead of model_name once exported
     "camera_index": 0,               # 0 = default webcam
     "confidence_threshold": 0.5,     # Minimum detection confidence
     "resolution": (640, 480),        # Camera resolution
+    "batch_size": 4,                 # Recent frames searched per YOLO call
+    "scene_pixel_threshold": 15,     # Grey-level change for a thumbnail pixel to count as changed
+    "scene_changed_fraction": 0.001, # Share of changed thumbnail pixels that triggers re-detection
+    "scene_cache_max_age": 1.0,      # Seconds a cached detection may be reused
 }
 
 # 🦾 Motor Agent
@@ -46,8 +64,9 @@ MOTOR_CONFIG = {
 # 🧠 Learning Agent
 LEARNING_CONFIG = {
     "enable_logging": True,
-    "log_file": LOGS_DIR / "system.log",
-    "save_frequency": 10,            # Save after every 10 actions
+    "log_file": LOGS_DIR / "stats.json",          # Aggregate stats snapshot
+    "history_file": LOGS_DIR / "history.msgpack", # Append-only action log
+    "save_frequency": 10,            # Flush log after every 10 actions
 }
 
 # 🧭 Master Agent
@@ -58,9 +77,9 @@ MASTER_CONFIG = {
 
 # GRASPABLE OBJECTS
 
-GRASPABLE_OBJECTS = {
+GRASPABLE_OBJECTS = frozenset({
     "bottle", "cup", "wine glass", "bowl",
     "banana", "apple", "orange", "sandwich",
     "cell phone", "book", "remote", "mouse",
     "keyboard", "scissors", "teddy bear"
-}
\ No newline at end of file
+})
\ No newline at end of file
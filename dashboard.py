@@ -13,34 +13,105 @@ import time
 import random
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
 import io
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
+from itertools import islice
 import plotly.graph_objects as go
 
 import json
+import orjson
+
+from utils.bbox import nms
 
 # Agent Endpoints (make sure they match your Flask APIs)
 SPEECH_API = "http://localhost:8002/speech/latest"
 VISION_API = "http://localhost:8001/vision/latest"
+STATE_API = "http://localhost:8000/state/latest"  # speech + vision in one call
+AGENT_TIMEOUT = 0.5  # seconds; agent polls run on every full rerun, so keep the UI responsive
+LOG_LIMIT = 200  # newest log entries kept in the session
+HISTORY_LIMIT = 5000  # success-rate points kept in the session
+PLOT_POINTS = 500  # history is strided down to about this many points for the chart
+DEMO_IMAGE_URL = "https://ultralytics.com/images/zidane.jpg"
 
 # Helper functions
-def fetch_speech_data():
+# One connection pool and worker pool shared by every rerun and session
+@st.cache_resource
+def http_session():
+    s = requests.Session()
+    s.mount("http://", HTTPAdapter(pool_connections=8, pool_maxsize=16))
+    return s
+
+@st.cache_resource
+def executor():
+    return ThreadPoolExecutor(max_workers=8)
+
+def _get_json(url: str):
     try:
-        res = requests.get(SPEECH_API, timeout=5)
-        return res.json()
+        res = http_session().get(url, timeout=AGENT_TIMEOUT)
+        if res.status_code == 204:  # No new data since the last poll
+            return {}
+        return orjson.loads(res.content)
     except Exception as e:
         return {"error": str(e)}
 
+# Agent telemetry is "latest" state, so keep it for about a second across reruns
+@st.cache_data(ttl=1.0, show_spinner=False)
+def fetch_speech_data():
+    return _get_json(SPEECH_API)
+
+@st.cache_data(ttl=1.0, show_spinner=False)
 def fetch_vision_data():
-    try:
-        res = requests.get(VISION_API, timeout=5)
-        return res.json()
-    except Exception as e:
-        return {"error": str(e)}
+    return _get_json(VISION_API)
+
+@st.cache_data(ttl=1.0, show_spinner=False)
+def fetch_agent_data():
+    """Fetch speech and vision from their own servers; the requests run concurrently"""
+    speech = executor().submit(_get_json, SPEECH_API)
+    vision = executor().submit(_get_json, VISION_API)
+    return speech.result(), vision.result()
+
+@st.cache_data(ttl=1.0, show_spinner=False)
+def fetch_state_data():
+    """
+    Fetch speech and vision with one request to the combined endpoint,
+    falling back to the per-agent servers when it is not running
+    """
+    data = _get_json(STATE_API)
+    if "error" in data:
+        speech, vision = fetch_agent_data()
+        return {"speech": speech, "vision": vision}
+    return data
+
+# Failures raise and are not cached, so a later rerun retries the download
+@st.cache_data(ttl=3600, show_spinner=False)
+def load_demo_image():
+    return Image.open(io.BytesIO(http_session().get(DEMO_IMAGE_URL, timeout=3).content))
+
+# Decoded uploads and overlays are reused across reruns for identical inputs
+@st.cache_data(max_entries=8, show_spinner=False)
+def load_image_bytes(data: bytes):
+    return Image.open(io.BytesIO(data))
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def annotate(image: Image.Image, detections: "Detections"):
+    return draw_detections(image, detections)
+
+# Figure is only rebuilt when the plotted points change
+@st.cache_data(max_entries=4, show_spinner=False)
+def build_history_fig(history: tuple, stride: int = 1):
+    ys = np.asarray(history, dtype=np.float32) * 100
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=np.arange(len(ys)) * stride, y=ys, mode='lines+markers', line=dict(color='#00ffff', width=3)))
+    fig.update_layout(title="SUCCESS RATE", xaxis_title="Attempt", yaxis_title="Rate (%)", height=300, plot_bgcolor='rgba(0,0,0,0.1)', paper_bgcolor='rgba(0,0,0,0)', font=dict(color='#00ffff'))
+    return fig
 
 def load_lottieurl(url: str):
     try:
-        r = requests.get(url, timeout=5)
+        r = http_session().get(url, timeout=5)
         if r.status_code == 200:
             return r.json()
     except:
@@ -53,48 +124,113 @@ def add_log(agent: str, action: str, status: str = "info"):
         "action": action,
         "status": status
     }
-    st.session_state.logs.insert(0, entry)
-    st.session_state.logs = st.session_state.logs[:200]
-
-def draw_detections(image: Image.Image, detections: list):
-    img = np.array(image.convert("RGB"))[:, :, ::-1].copy()
-    colors = {"bottle": (0, 255, 127), "cup": (0, 191, 255), "box": (138, 43, 226), "can": (255, 215, 0)}
-    for det in detections:
-        x1, y1, x2, y2 = det["bbox"]
-        conf = det["confidence"]
-        label = det["label"]
-        color = colors.get(label, (0, 255, 255))
-        cv2.rectangle(img, (x1, y1), (x2, y2), color, 3)
-        cv2.putText(img, f"{label} {conf:.0%}", (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
-    return Image.fromarray(img[:, :, ::-1])
+    st.session_state.logs.appendleft(entry)
+    st.session_state.logs_version += 1
 
-def simulate_detections(w, h):
-    labels = ["bottle", "cup", "box", "can"]
-    n = random.randint(1, 3)
-    dets = []
-    for _ in range(n):
-        lw = random.randint(int(w*0.15), int(w*0.35))
-        lh = random.randint(int(h*0.15), int(h*0.35))
-        x1 = random.randint(20, max(20, w - lw - 20))
-        y1 = random.randint(20, max(20, h - lh - 20))
-        dets.append({"bbox": [x1, y1, x1 + lw, y1 + lh], "confidence": random.uniform(0.65, 0.98), "label": random.choice(labels)})
-    return dets
+def rerun_app(key: str, kind: str, text: str):
+    """
+    Rerun the whole app after a fragment changed shared state
 
-# Session state
-if "logs" not in st.session_state:
-    st.session_state.logs = []
-if "last_command" not in st.session_state:
-    st.session_state.last_command = {}
-if "metrics" not in st.session_state:
-    st.session_state.metrics = {"total_grasps": 0, "successes": 0, "last_response_time": 0.0, "history": []}
-if "detections" not in st.session_state:
-    st.session_state.detections = []
+    Fragment reruns leave the logs panel, sidebar stats and analytics stale,
+    so queue the status message for show_flash and refresh everything.
 
-# Page config
-st.set_page_config(page_title="AI Robotic Grasping", layout="wide", page_icon="🤖")
+    Args:
+        key: Tab the message belongs to
+        kind: Streamlit status element, e.g. "success" or "error"
+        text: Message text
+    """
+    st.session_state.flash[key] = (kind, text)
+    st.rerun(scope="app")
 
-# Styling
-st.markdown("""
+def show_flash(key: str):
+    """Show (once) the status message queued by rerun_app"""
+    msg = st.session_state.flash.pop(key, None)
+    if msg:
+        kind, text = msg
+        getattr(st, kind)(text)
+
+LOG_COLUMNS = ("timestamp", "agent", "action", "status")
+
+def logs_cached(key: str, build):
+    """
+    Per-session memo of a value derived from the logs
+
+    Args:
+        key: Session state slot for the cached value
+        build: Zero-argument function producing the value
+
+    Returns:
+        build() result, reused until logs_version changes
+    """
+    version = st.session_state.logs_version
+    cached = st.session_state.get(key)
+    if cached is None or cached[0] != version:
+        cached = (version, build())
+        st.session_state[key] = cached
+    return cached[1]
+
+LABELS = ("bottle", "cup", "box", "can")
+
+@dataclass(slots=True, frozen=True)
+class Detections:
+    """
+    Detections stored column-wise
+
+    Attributes:
+        bbox: (N, 4) int32 boxes as x1, y1, x2, y2
+        conf: (N,) float32 confidences
+        label_idx: (N,) int8 indices into LABELS
+    """
+    bbox: np.ndarray
+    conf: np.ndarray
+    label_idx: np.ndarray
+
+    def __len__(self):
+        return len(self.conf)
+
+# Box colors (RGB), drawn straight onto the RGB array
+DETECTION_COLORS = {"bottle": (127, 255, 0), "cup": (255, 191, 0), "box": (226, 43, 138), "can": (0, 215, 255)}
+DEFAULT_COLOR = (255, 255, 0)
+BOX_THICKNESS = 3
+
+def draw_detections(image: Image.Image, detections: Detections):
+    img = np.array(image.convert("RGB"))
+    h, w = img.shape[:2]
+    t = BOX_THICKNESS
+    clipped = np.clip(detections.bbox, 0, (w, h, w, h)).tolist()
+    for i, (x1, y1, x2, y2) in enumerate(clipped):
+        conf = detections.conf[i]
+        label = LABELS[detections.label_idx[i]]
+        color = DETECTION_COLORS.get(label, DEFAULT_COLOR)
+        # Box edges as plain slice writes, clipped to the image
+        img[y1:y1 + t, x1:x2] = color
+        img[max(y2 - t, 0):y2, x1:x2] = color
+        img[y1:y2, x1:x1 + t] = color
+        img[y1:y2, max(x2 - t, 0):x2] = color
+        cv2.putText(img, f"{label} {conf:.0%}", (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+    return Image.fromarray(img)
+
+def simulate_detections(w, h):
+    rng = np.random.default_rng()
+    n = int(rng.integers(1, 3, endpoint=True))
+    # One draw per field for all n boxes
+    lw = rng.integers(int(w*0.15), int(w*0.35), size=n, endpoint=True)
+    lh = rng.integers(int(h*0.15), int(h*0.35), size=n, endpoint=True)
+    x1 = rng.integers(20, np.maximum(20, w - lw - 20), endpoint=True)
+    y1 = rng.integers(20, np.maximum(20, h - lh - 20), endpoint=True)
+    conf = rng.uniform(0.65, 0.98, size=n)
+    label_idx = rng.integers(0, len(LABELS), size=n)
+    boxes = np.stack([x1, y1, x1 + lw, y1 + lh], axis=1)
+    # Same overlap suppression a real detector applies
+    keep = nms(boxes, conf)
+    return Detections(
+        bbox=boxes[keep].astype(np.int32),
+        conf=conf[keep].astype(np.float32),
+        label_idx=label_idx[keep].astype(np.int8),
+    )
+
+# Static markup, emitted unchanged on every rerun
+_CSS = """
 <style>
 @import url('https://fonts.googleapis.com/css2?family=Orbitron:wght@400;700;900&family=Roboto+Mono&display=swap');
 .stApp {
@@ -161,7 +297,122 @@ h1, h2, h3 {
 }
 .led-on { background: #00ff00; box-shadow: 0 0 10px #00ff00; }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+_ROBOT_HTML = '''
+<div style="text-align: center; padding: 20px;">
+    <div style="position: relative; display: inline-block;">
+        <div style="font-size: 90px; animation: float 3s ease-in-out infinite;">
+            🤖
+        </div>
+        <div style="position: absolute; top: -10px; right: -10px; width: 20px; height: 20px; background: #00ff00; border-radius: 50%; animation: blink 1s infinite;"></div>
+    </div>
+</div>
+<style>
+@keyframes float {
+    0%, 100% { transform: translateY(0px); }
+    50% { transform: translateY(-10px); }
+}
+@keyframes blink {
+    0%, 50%, 100% { opacity: 1; }
+    25%, 75% { opacity: 0; }
+}
+</style>
+'''
+
+_WAVEFORM_HTML = '''
+<div style="text-align: center; padding: 30px; background: rgba(0,255,255,0.05); border-radius: 10px;">
+    <div style="display: flex; justify-content: center; align-items: center; gap: 8px; height: 100px;">
+        <div style="width: 6px; background: #00ffff; animation: wave 0.8s ease-in-out infinite; animation-delay: 0s;"></div>
+        <div style="width: 6px; background: #00ffff; animation: wave 0.8s ease-in-out infinite; animation-delay: 0.1s;"></div>
+        <div style="width: 6px; background: #00ffff; animation: wave 0.8s ease-in-out infinite; animation-delay: 0.2s;"></div>
+        <div style="width: 40px; height: 40px; background: linear-gradient(135deg, #00ffff, #ff00ff); border-radius: 50%; display: flex; align-items: center; justify-content: center; font-size: 24px; box-shadow: 0 0 20px rgba(0,255,255,0.5);">
+            🎤
+        </div>
+        <div style="width: 6px; background: #00ffff; animation: wave 0.8s ease-in-out infinite; animation-delay: 0.3s;"></div>
+        <div style="width: 6px; background: #00ffff; animation: wave 0.8s ease-in-out infinite; animation-delay: 0.4s;"></div>
+        <div style="width: 6px; background: #00ffff; animation: wave 0.8s ease-in-out infinite; animation-delay: 0.5s;"></div>
+    </div>
+    <div style="color: #00ffff; font-family: Orbitron; margin-top: 15px; font-size: 14px;">
+        SPEECH RECOGNITION ACTIVE
+    </div>
+</div>
+<style>
+@keyframes wave {
+    0%, 100% { height: 20px; opacity: 0.3; }
+    50% { height: 80px; opacity: 1; }
+}
+</style>
+'''
+
+_ARM_HTML = '''
+<div style="text-align: center; padding: 40px; background: rgba(0,255,255,0.03); border-radius: 10px;">
+    <div style="position: relative; display: inline-block;">
+        <!-- Arm base -->
+        <div style="width: 80px; height: 20px; background: linear-gradient(135deg, #00ffff, #0099cc); border-radius: 10px; margin: 0 auto;"></div>
+        <!-- Arm segment 1 -->
+        <div style="width: 15px; height: 80px; background: linear-gradient(180deg, #00ffff, #0099cc); margin: 0 auto; animation: armMove1 2s ease-in-out infinite;"></div>
+        <!-- Arm segment 2 -->
+        <div style="width: 12px; height: 60px; background: linear-gradient(180deg, #0099cc, #00ffff); margin: 0 auto; animation: armMove2 2s ease-in-out infinite; animation-delay: 0.2s;"></div>
+        <!-- Gripper -->
+        <div style="margin-top: 10px; display: flex; justify-content: center; gap: 5px; animation: grip 2s ease-in-out infinite;">
+            <div style="width: 30px; height: 8px; background: #ff00ff; border-radius: 4px; transform-origin: right; animation: gripLeft 2s ease-in-out infinite;"></div>
+            <div style="width: 30px; height: 8px; background: #ff00ff; border-radius: 4px; transform-origin: left; animation: gripRight 2s ease-in-out infinite;"></div>
+        </div>
+        <!-- Target object -->
+        <div style="margin-top: 20px; font-size: 30px; animation: targetBounce 2s ease-in-out infinite;">
+            📦
+        </div>
+    </div>
+    <div style="color: #00ffff; font-family: Orbitron; margin-top: 20px; font-size: 16px; font-weight: 700;">
+        ROBOTIC GRIPPER SYSTEM
+    </div>
+    <div style="color: #00ff88; font-family: Roboto Mono; font-size: 12px; margin-top: 8px;">
+        [ 6-DOF ARTICULATED ARM ]
+    </div>
+</div>
+<style>
+@keyframes armMove1 {
+    0%, 100% { transform: rotate(0deg); }
+    50% { transform: rotate(-5deg); }
+}
+@keyframes armMove2 {
+    0%, 100% { transform: rotate(0deg); }
+    50% { transform: rotate(5deg); }
+}
+@keyframes gripLeft {
+    0%, 100% { transform: rotate(0deg); }
+    50% { transform: rotate(-15deg); }
+}
+@keyframes gripRight {
+    0%, 100% { transform: rotate(0deg); }
+    50% { transform: rotate(15deg); }
+}
+@keyframes targetBounce {
+    0%, 100% { transform: translateY(0px); }
+    50% { transform: translateY(-5px); }
+}
+</style>
+'''
+
+# Session state
+if "logs" not in st.session_state:
+    st.session_state.logs = deque(maxlen=LOG_LIMIT)
+    st.session_state.logs_version = 0
+if "last_command" not in st.session_state:
+    st.session_state.last_command = {}
+if "metrics" not in st.session_state:
+    st.session_state.metrics = {"total_grasps": 0, "successes": 0, "last_response_time": 0.0, "history": deque(maxlen=HISTORY_LIMIT)}
+if "flash" not in st.session_state:
+    st.session_state.flash = {}
+if "detections" not in st.session_state:
+    st.session_state.detections = None
+
+# Page config
+st.set_page_config(page_title="AI Robotic Grasping", layout="wide", page_icon="🤖")
+
+# Styling
+st.markdown(_CSS, unsafe_allow_html=True)
 
 # Header
 st.markdown('<div class="cyber-header">', unsafe_allow_html=True)
@@ -171,26 +422,7 @@ with col1:
     st.markdown('<p style="color: #00ff88; font-family: Roboto Mono;">[ VISION • SPEECH • MOTOR • LEARNING ]</p>', unsafe_allow_html=True)
 with col2:
     # Animated robot visualization
-    st.markdown('''
-    <div style="text-align: center; padding: 20px;">
-        <div style="position: relative; display: inline-block;">
-            <div style="font-size: 90px; animation: float 3s ease-in-out infinite;">
-                🤖
-            </div>
-            <div style="position: absolute; top: -10px; right: -10px; width: 20px; height: 20px; background: #00ff00; border-radius: 50%; animation: blink 1s infinite;"></div>
-        </div>
-    </div>
-    <style>
-    @keyframes float {
-        0%, 100% { transform: translateY(0px); }
-        50% { transform: translateY(-10px); }
-    }
-    @keyframes blink {
-        0%, 50%, 100% { opacity: 1; }
-        25%, 75% { opacity: 0; }
-    }
-    </style>
-    ''', unsafe_allow_html=True)
+    st.markdown(_ROBOT_HTML, unsafe_allow_html=True)
 with col3:
     st.markdown(f'<div style="text-align: right; padding-top: 15px;"><div style="color: #00ff00; font-size: 1.4em; font-family: Orbitron;">ACTIVE</div><div style="color: #00ffff; font-size: 0.85em;">{len(st.session_state.logs)} EVENTS</div></div>', unsafe_allow_html=True)
 st.markdown('</div>', unsafe_allow_html=True)
@@ -215,11 +447,11 @@ with st.sidebar:
             time.sleep(0.3)
             success = random.random() < 0.85
             add_log("motor", "SUCCESS" if success else "FAILED", "success" if success else "error")
-            st.session_state.metrics["total_grasps"] += 1
-            if success:
-                st.session_state.metrics["successes"] += 1
-            rate = st.session_state.metrics["successes"] / st.session_state.metrics["total_grasps"]
-            st.session_state.metrics["history"].append(rate)
+            m = st.session_state.metrics
+            total = m["total_grasps"] + 1
+            succ = m["successes"] + int(success)
+            m["history"].append(succ / total)
+            m.update({"total_grasps": total, "successes": succ})
         st.success("✅ COMPLETE")
     
     st.markdown("---")
@@ -228,40 +460,37 @@ with st.sidebar:
     rate = (st.session_state.metrics["successes"] / total * 100) if total > 0 else 0
     st.metric("ATTEMPTS", total)
     st.metric("SUCCESS", f"{rate:.1f}%")
+    
+    st.markdown("---")
+    st.markdown("### 📡 LIVE AGENTS")
+    state = fetch_state_data()
+    speech, vision = state["speech"], state["vision"]
+    if "error" in speech and "error" in vision:
+        st.caption("🔌 AGENTS OFFLINE")
+    else:
+        # A new voice command becomes the current intent
+        cmd = speech.get("data") or {}
+        if cmd.get("action"):
+            # Commands like "stop" or "scan" carry object=None
+            st.session_state.last_command = {
+                "action": cmd["action"],
+                "object": cmd.get("object") or "—",
+                "confidence": cmd.get("confidence", 0.0),
+            }
+        if "error" in vision:
+            st.caption("👁️ VISION OFFLINE")
+        else:
+            st.caption(f"👁️ {len(vision.get('detections', []))} OBJECTS IN VIEW" if vision else "👁️ NO CAMERA FRAME")
 
-# Tabs
-tab1, tab2, tab3, tab4 = st.tabs(["🎤 SPEECH", "👁️ VISION", "🤖 MOTOR", "📊 ANALYTICS"])
-
-with tab1:
+# Tabs (each is a fragment so its widgets only rerun that tab)
+@st.fragment
+def speech_tab():
     col1, col2 = st.columns(2)
     with col1:
         st.markdown('<div class="tech-card">', unsafe_allow_html=True)
         st.markdown("### 🎙️ VOICE INTERFACE")
         # Animated voice waveform visualization
-        st.markdown('''
-        <div style="text-align: center; padding: 30px; background: rgba(0,255,255,0.05); border-radius: 10px;">
-            <div style="display: flex; justify-content: center; align-items: center; gap: 8px; height: 100px;">
-                <div style="width: 6px; background: #00ffff; animation: wave 0.8s ease-in-out infinite; animation-delay: 0s;"></div>
-                <div style="width: 6px; background: #00ffff; animation: wave 0.8s ease-in-out infinite; animation-delay: 0.1s;"></div>
-                <div style="width: 6px; background: #00ffff; animation: wave 0.8s ease-in-out infinite; animation-delay: 0.2s;"></div>
-                <div style="width: 40px; height: 40px; background: linear-gradient(135deg, #00ffff, #ff00ff); border-radius: 50%; display: flex; align-items: center; justify-content: center; font-size: 24px; box-shadow: 0 0 20px rgba(0,255,255,0.5);">
-                    🎤
-                </div>
-                <div style="width: 6px; background: #00ffff; animation: wave 0.8s ease-in-out infinite; animation-delay: 0.3s;"></div>
-                <div style="width: 6px; background: #00ffff; animation: wave 0.8s ease-in-out infinite; animation-delay: 0.4s;"></div>
-                <div style="width: 6px; background: #00ffff; animation: wave 0.8s ease-in-out infinite; animation-delay: 0.5s;"></div>
-            </div>
-            <div style="color: #00ffff; font-family: Orbitron; margin-top: 15px; font-size: 14px;">
-                SPEECH RECOGNITION ACTIVE
-            </div>
-        </div>
-        <style>
-        @keyframes wave {
-            0%, 100% { height: 20px; opacity: 0.3; }
-            50% { height: 80px; opacity: 1; }
-        }
-        </style>
-        ''', unsafe_allow_html=True)
+        st.markdown(_WAVEFORM_HTML, unsafe_allow_html=True)
         typed = st.text_input("COMMAND:", placeholder="pick the bottle")
         if st.button("📤 SEND"):
             if typed:
@@ -270,7 +499,8 @@ with tab1:
                 obj = next((w for w in ["bottle", "cup", "box"] if w in words), "object")
                 st.session_state.last_command = {"action": action, "object": obj, "confidence": 0.9}
                 add_log("speech", f"TEXT: {typed}", "success")
-                st.success(f"✅ {action.upper()} {obj.upper()}")
+                rerun_app("speech", "success", f"✅ {action.upper()} {obj.upper()}")
+        show_flash("speech")
         st.markdown('</div>', unsafe_allow_html=True)
     
     with col2:
@@ -279,25 +509,26 @@ with tab1:
         if st.session_state.last_command:
             cmd = st.session_state.last_command
             col_a, col_b = st.columns(2)
-            col_a.metric("ACTION", cmd.get("action", "—").upper())
-            col_b.metric("OBJECT", cmd.get("object", "—").upper())
+            col_a.metric("ACTION", (cmd.get("action") or "—").upper())
+            col_b.metric("OBJECT", (cmd.get("object") or "—").upper())
             if st.button("✅ EXECUTE", use_container_width=True):
                 st.success("⚡ DISPATCHED")
         else:
             st.info("⏳ AWAITING COMMAND")
         st.markdown('</div>', unsafe_allow_html=True)
 
-with tab2:
+@st.fragment
+def vision_tab():
     col1, col2 = st.columns([2, 1])
     with col1:
         st.markdown('<div class="tech-card">', unsafe_allow_html=True)
         st.markdown("### 📹 CAMERA")
         uploaded = st.file_uploader("UPLOAD", type=["jpg", "png"])
         if uploaded:
-            img = Image.open(uploaded)
+            img = load_image_bytes(uploaded.getvalue())
         else:
             try:
-                img = Image.open(io.BytesIO(requests.get("https://ultralytics.com/images/zidane.jpg", timeout=3).content))
+                img = load_demo_image()
             except:
                 img = Image.new("RGB", (640, 480), (20, 25, 45))
         st.image(img, use_column_width=True)
@@ -308,82 +539,35 @@ with tab2:
         st.markdown("### 🔍 DETECT")
         if st.button("🎯 RUN YOLO", use_container_width=True):
             with st.spinner("ANALYZING..."):
-                time.sleep(0.8)
                 dets = simulate_detections(img.width, img.height)
-                annotated = draw_detections(img, dets)
-                st.image(annotated, use_column_width=True)
-                for d in dets:
-                    add_log("vision", f"{d['label']} {d['confidence']:.0%}", "success")
-                st.success(f"✅ {len(dets)} OBJECTS")
+                st.session_state.detections = dets
+                for label_i, conf in zip(dets.label_idx.tolist(), dets.conf.tolist()):
+                    add_log("vision", f"{LABELS[label_i]} {conf:.0%}", "success")
+            rerun_app("vision", "success", f"✅ {len(dets)} OBJECTS")
+        show_flash("vision")
+        if st.session_state.detections is not None:
+            st.image(annotate(img, st.session_state.detections), use_column_width=True)
         st.markdown('</div>', unsafe_allow_html=True)
 
-with tab3:
+@st.fragment
+def motor_tab():
     st.markdown('<div class="tech-card">', unsafe_allow_html=True)
     col1, col2 = st.columns([2, 1])
     with col1:
         st.markdown("### 🦾 ROBOT ARM")
         # Animated robotic arm gripper
-        st.markdown('''
-        <div style="text-align: center; padding: 40px; background: rgba(0,255,255,0.03); border-radius: 10px;">
-            <div style="position: relative; display: inline-block;">
-                <!-- Arm base -->
-                <div style="width: 80px; height: 20px; background: linear-gradient(135deg, #00ffff, #0099cc); border-radius: 10px; margin: 0 auto;"></div>
-                <!-- Arm segment 1 -->
-                <div style="width: 15px; height: 80px; background: linear-gradient(180deg, #00ffff, #0099cc); margin: 0 auto; animation: armMove1 2s ease-in-out infinite;"></div>
-                <!-- Arm segment 2 -->
-                <div style="width: 12px; height: 60px; background: linear-gradient(180deg, #0099cc, #00ffff); margin: 0 auto; animation: armMove2 2s ease-in-out infinite; animation-delay: 0.2s;"></div>
-                <!-- Gripper -->
-                <div style="margin-top: 10px; display: flex; justify-content: center; gap: 5px; animation: grip 2s ease-in-out infinite;">
-                    <div style="width: 30px; height: 8px; background: #ff00ff; border-radius: 4px; transform-origin: right; animation: gripLeft 2s ease-in-out infinite;"></div>
-                    <div style="width: 30px; height: 8px; background: #ff00ff; border-radius: 4px; transform-origin: left; animation: gripRight 2s ease-in-out infinite;"></div>
-                </div>
-                <!-- Target object -->
-                <div style="margin-top: 20px; font-size: 30px; animation: targetBounce 2s ease-in-out infinite;">
-                    📦
-                </div>
-            </div>
-            <div style="color: #00ffff; font-family: Orbitron; margin-top: 20px; font-size: 16px; font-weight: 700;">
-                ROBOTIC GRIPPER SYSTEM
-            </div>
-            <div style="color: #00ff88; font-family: Roboto Mono; font-size: 12px; margin-top: 8px;">
-                [ 6-DOF ARTICULATED ARM ]
-            </div>
-        </div>
-        <style>
-        @keyframes armMove1 {
-            0%, 100% { transform: rotate(0deg); }
-            50% { transform: rotate(-5deg); }
-        }
-        @keyframes armMove2 {
-            0%, 100% { transform: rotate(0deg); }
-            50% { transform: rotate(5deg); }
-        }
-        @keyframes gripLeft {
-            0%, 100% { transform: rotate(0deg); }
-            50% { transform: rotate(-15deg); }
-        }
-        @keyframes gripRight {
-            0%, 100% { transform: rotate(0deg); }
-            50% { transform: rotate(15deg); }
-        }
-        @keyframes targetBounce {
-            0%, 100% { transform: translateY(0px); }
-            50% { transform: translateY(-5px); }
-        }
-        </style>
-        ''', unsafe_allow_html=True)
+        st.markdown(_ARM_HTML, unsafe_allow_html=True)
         if st.button("🎮 EXECUTE GRASP", use_container_width=True):
-            progress = st.progress(0)
-            for i in range(100):
-                progress.progress(i + 1)
-                time.sleep(0.02)
             success = random.random() < 0.87
+            st.session_state.metrics["successes"] += success
+            st.session_state.metrics["total_grasps"] += 1
             if success:
-                st.success("✅ GRASP SUCCESS")
-                st.session_state.metrics["successes"] += 1
+                rerun_app("motor", "success", "✅ GRASP SUCCESS")
             else:
-                st.error("❌ GRASP FAILED")
-            st.session_state.metrics["total_grasps"] += 1
+                rerun_app("motor", "error", "❌ GRASP FAILED")
+        if "motor" in st.session_state.flash:
+            st.progress(100)
+            show_flash("motor")
     with col2:
         st.markdown("### 🎛️ CONTROL")
         st.slider("GRIP (cm)", 1, 10, 5)
@@ -391,7 +575,8 @@ with tab3:
         st.metric("ANGLE", f"{random.randint(15, 85)}°")
     st.markdown('</div>', unsafe_allow_html=True)
 
-with tab4:
+@st.fragment
+def analytics_tab():
     st.markdown('<div class="tech-card">', unsafe_allow_html=True)
     total = st.session_state.metrics["total_grasps"]
     success = st.session_state.metrics["successes"]
@@ -401,12 +586,23 @@ with tab4:
     col2.metric("SUCCESS", success)
     col3.metric("RATE", f"{rate:.1f}%")
     if len(st.session_state.metrics["history"]) > 1:
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(y=[h*100 for h in st.session_state.metrics["history"]], mode='lines+markers', line=dict(color='#00ffff', width=3)))
-        fig.update_layout(title="SUCCESS RATE", xaxis_title="Attempt", yaxis_title="Rate (%)", height=300, plot_bgcolor='rgba(0,0,0,0.1)', paper_bgcolor='rgba(0,0,0,0)', font=dict(color='#00ffff'))
+        history = st.session_state.metrics["history"]
+        stride = max(1, len(history) // PLOT_POINTS)
+        fig = build_history_fig(tuple(islice(history, 0, None, stride)), stride)
         st.plotly_chart(fig, use_container_width=True)
     st.markdown('</div>', unsafe_allow_html=True)
 
+tab1, tab2, tab3, tab4 = st.tabs(["🎤 SPEECH", "👁️ VISION", "🤖 MOTOR", "📊 ANALYTICS"])
+
+with tab1:
+    speech_tab()
+with tab2:
+    vision_tab()
+with tab3:
+    motor_tab()
+with tab4:
+    analytics_tab()
+
 # Logs
 st.markdown("---")
 st.markdown('<div class="tech-card">', unsafe_allow_html=True)
@@ -414,16 +610,18 @@ st.markdown("### 📡 SYSTEM LOGS")
 col1, col2 = st.columns([3, 1])
 with col1:
     if st.session_state.logs:
-        st.dataframe(pd.DataFrame(st.session_state.logs[:20]), use_container_width=True, height=200)
+        table = logs_cached("_logs_table", lambda: pd.DataFrame(list(islice(st.session_state.logs, 20)), columns=LOG_COLUMNS))
+        st.dataframe(table, use_container_width=True, height=200)
     else:
         st.info("NO LOGS")
 with col2:
     if st.button("🗑️ CLEAR", use_container_width=True):
-        st.session_state.logs = []
+        st.session_state.logs.clear()
+        st.session_state.logs_version += 1
         st.success("CLEARED")
     if st.button("💾 EXPORT", use_container_width=True):
         if st.session_state.logs:
-            csv = pd.DataFrame(st.session_state.logs).to_csv(index=False).encode('utf-8')
+            csv = logs_cached("_logs_csv", lambda: pd.DataFrame(list(st.session_state.logs), columns=LOG_COLUMNS).to_csv(index=False).encode('utf-8'))
             st.download_button("📥 DOWNLOAD", csv, "logs.csv", "text/csv", use_container_width=True)
 st.markdown('</div>', unsafe_allow_html=True)
 
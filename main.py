@@ -1,11 +1,10 @@
+import asyncio
 import sys
 from pathlib import Path
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from agents.master_agent import MasterAgent
-
 def main():
     """Main function"""
     print("\n" + "="*70)
@@ -30,8 +29,10 @@ def main():
     
     # Initialize and start system
     try:
+        # Imported here so the agent stack (models, audio) only loads once we're starting
+        from agents.master_agent import MasterAgent
         master = MasterAgent()
-        master.start()
+        asyncio.run(master.start())
         
     except KeyboardInterrupt:
         print("\n\n👋 Goodbye!")
@@ -0,0 +1,64 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+DASHBOARD = str(Path(__file__).resolve().parent.parent / "dashboard.py")
+
+
+def _metrics(at: AppTest) -> dict:
+    return {m.label: m.value for m in at.metric}
+
+
+def test_speech_tab_renders_command_without_object():
+    at = AppTest.from_file(DASHBOARD, default_timeout=60)
+    at.session_state.last_command = {"action": "stop", "object": None, "confidence": 0.5}
+    at.run()
+
+    assert not at.exception
+    assert _metrics(at)["ACTION"] == "STOP"
+    assert _metrics(at)["OBJECT"] == "—"
+
+
+@pytest.fixture
+def state_server():
+    """Stub /state/latest returning a recognized command with no object"""
+    payload = json.dumps({
+        "speech": {"agent": "speech_agent", "type": "intent", "status": "success",
+                   "data": {"action": "scan", "object": None, "confidence": 0.5}},
+        "vision": {},
+    }).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    try:
+        server = HTTPServer(("localhost", 8000), Handler)
+    except OSError:
+        pytest.skip("port 8000 is in use")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    st.cache_data.clear()  # Drop agent data fetched by earlier tests
+    yield
+    server.shutdown()
+    server.server_close()
+
+
+def test_live_command_without_object(state_server):
+    at = AppTest.from_file(DASHBOARD, default_timeout=60)
+    at.run()
+
+    assert not at.exception
+    assert at.session_state.last_command["object"] == "—"
+    assert _metrics(at)["ACTION"] == "SCAN"
+    assert _metrics(at)["OBJECT"] == "—"
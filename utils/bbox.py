@@ -0,0 +1,58 @@
+import numpy as np
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Pairwise intersection-over-union of two box sets
+
+    Args:
+        a: (N, 4) boxes as x1, y1, x2, y2
+        b: (M, 4) boxes as x1, y1, x2, y2
+
+    Returns:
+        (N, M) float32 IoU matrix
+    """
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+
+    # Broadcast (N, 1) against (1, M) so every pair is one array op
+    ix1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    iy1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    ix2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    iy2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float = 0.5) -> np.ndarray:
+    """
+    Greedy non-maximum suppression
+
+    Args:
+        boxes: (N, 4) boxes as x1, y1, x2, y2
+        scores: (N,) confidence per box
+        iou_threshold: Overlap above which the weaker box is dropped
+
+    Returns:
+        Indices of kept boxes, highest score first
+    """
+    order = np.argsort(scores)[::-1]
+    overlaps = iou_matrix(boxes, boxes) > iou_threshold
+    suppressed = np.zeros(len(order), dtype=bool)
+    keep = []
+
+    for i in order:
+        if suppressed[i]:
+            continue
+        keep.append(i)
+        suppressed |= overlaps[i]
+
+    return np.array(keep, dtype=np.intp)
+
+# Example usage:
+# boxes = np.array([[0, 0, 10, 10], [1, 1, 10, 10], [20, 20, 30, 30]])
+# nms(boxes, np.array([0.9, 0.8, 0.7]))  # -> array([0, 2])
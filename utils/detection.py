@@ -0,0 +1,43 @@
+from dataclasses import dataclass
+
+
+@dataclass(slots=True, frozen=True)
+class BBox:
+    """
+    Bounding box in pixel coordinates
+
+    Attributes:
+        x1, y1: Top-left corner
+        x2, y2: Bottom-right corner
+        center_x, center_y: Box center
+        width, height: Box size
+    """
+    x1: int
+    y1: int
+    x2: int
+    y2: int
+    center_x: int
+    center_y: int
+    width: int
+    height: int
+
+
+@dataclass(slots=True, frozen=True)
+class Detection:
+    """
+    Single object detected by the vision agent
+
+    Attributes:
+        class_name: YOLO class label
+        confidence: Detection confidence (0-1)
+        bbox: Bounding box
+        is_graspable: Whether the robot can pick it up
+    """
+    class_name: str
+    confidence: float
+    bbox: BBox
+    is_graspable: bool
+
+# Example usage:
+# det = Detection("bottle", 0.9, BBox(10, 10, 50, 90, 30, 50, 40, 80), True)
+# dataclasses.asdict(det) for JSON at the HTTP boundary
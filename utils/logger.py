@@ -0,0 +1,28 @@
+import logging
+import sys
+
+from config.settings import LOG_LEVEL
+
+ROOT_LOGGER = "robot"
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Get a logger under the shared "robot" namespace
+    
+    Args:
+        name: Agent name, e.g. "motor_agent"
+    
+    Returns:
+        Logger writing plain messages to stdout at LOG_LEVEL
+    """
+    root = logging.getLogger(ROOT_LOGGER)
+    
+    if not root.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        root.addHandler(handler)
+        root.setLevel(LOG_LEVEL)
+        root.propagate = False
+    
+    return root.getChild(name)
@@ -1,12 +1,44 @@
 import time
+from dataclasses import dataclass
+from datetime import datetime
 from typing import Dict, Any
 
+
+@dataclass(slots=True, frozen=True)
+class Message:
+    """
+    Standardized message passed between agents
+    
+    Attributes:
+        ts_ns: Creation time as epoch nanoseconds (format with format_ts)
+        agent: Name of sending agent
+        type: Type of message (intent, detection, action, etc.)
+        data: Message payload
+        status: success/error/warning
+    """
+    ts_ns: int
+    agent: str
+    type: str
+    data: Dict[str, Any]
+    status: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Shallow dict for JSON; unlike dataclasses.asdict, data is not deep-copied"""
+        return {
+            "ts_ns": self.ts_ns,
+            "agent": self.agent,
+            "type": self.type,
+            "data": self.data,
+            "status": self.status,
+        }
+
+
 def create_message(
     agent_name: str,
     message_type: str,
     data: Dict[str, Any],
     status: str = "success"
-) -> Dict:
+) -> Message:
     """
     Create standardized message
     
@@ -17,15 +49,29 @@ def create_message(
         status: success/error/warning
     
     Returns:
-        Standardized message dict
+        Standardized Message
+    """
+    return Message(
+        time.time_ns(),
+        agent_name,
+        message_type,
+        data,
+        status
+    )
+
+
+def format_ts(ts_ns: int) -> str:
+    """
+    Format a message timestamp for display
+
+    Args:
+        ts_ns: Epoch nanoseconds, e.g. Message.ts_ns
+
+    Returns:
+        Local time as "YYYY-MM-DD HH:MM:SS"
     """
-    return {
-        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-        "agent": agent_name,
-        "type": message_type,
-        "data": data,
-        "status": status
-    }
+    return datetime.fromtimestamp(ts_ns / 1e9).strftime("%Y-%m-%d %H:%M:%S")
 
 # Example usage:
-# msg = create_message("speech_agent", "intent", {"action": "pick", "object": "bottle"})
\ No newline at end of file
+# msg = create_message("speech_agent", "intent", {"action": "pick", "object": "bottle"})
+# msg.status, msg.data["action"], format_ts(msg.ts_ns)